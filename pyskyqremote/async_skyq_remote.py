@@ -0,0 +1,348 @@
+"""Python module for accessing SkyQ box and EPG from asyncio."""
+
+import asyncio
+import logging
+from datetime import timedelta
+
+import aiohttp
+
+from .classes.app import AppInformation
+from .classes.asyncdeviceaccess import AsyncDeviceAccess
+from .classes.channel import ChannelInformation
+from .classes.channelepg import ChannelEPGInformation, epg_error
+from .classes.device import DeviceInformation, TransportInfo
+from .classes.media import MediaInformation
+from .classes.recordings import RecordingsInformation
+from .const import (
+    ALLRECORDINGS,
+    CIRCUIT_CLOSED,
+    CIRCUIT_FAILURE_THRESHOLD,
+    COMMANDS,
+    EPG_BULK_WORKERS,
+    EPG_TIMEOUT,
+    REST_PATH_APPS,
+    REST_PATH_DEVICEINFO,
+    REST_PATH_SYSTEMINFO,
+    REST_POOL_SIZE,
+    REST_RECORDINGS_LIST,
+    REST_SYSTEM_TIME,
+    SKY_STATE_UNSUPPORTED,
+    UNSUPPORTED_DEVICES,
+    UPNP_GET_MEDIA_INFO,
+    UPNP_GET_TRANSPORT_INFO,
+    WS_CURRENT_APPS,
+)
+from .skyq_remote import _RemoteConfig
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncSkyQRemote:
+    """AsyncSkyQRemote is the asyncio instantiation of the SKYQ remote control."""
+
+    commands = COMMANDS
+
+    def __init__(
+        self,
+        host,
+        port=49160,
+        json_port=9006,
+        pool_size=REST_POOL_SIZE,
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        epg_store=None,
+        channel_lineups=None,
+    ):
+        """Stand up a new SkyQ box, call setup() to connect to it."""
+        self._remote_setup = False
+        self._device_type = None
+        self._host = host
+        self._override_country = None
+
+        self._app_information = None
+        self._channel_information = None
+        self._channel_epg_information = None
+        self._media_information = None
+        self._recordings_information = None
+
+        self._device_access = AsyncDeviceAccess(
+            host, json_port, port, pool_size, failure_threshold
+        )
+        self._remote_config = _RemoteConfig(
+            host,
+            port,
+            json_port,
+            0,
+            device_access=self._device_access,
+            epg_store=epg_store,
+            channel_lineups=channel_lineups,
+        )
+        self._device_information = DeviceInformation(self._remote_config)
+
+    async def __aenter__(self):
+        """Set up the remote on entering the runtime context."""
+        await self.setup()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Close the remote on leaving the runtime context."""
+        await self.close()
+
+    @property
+    def device_setup(self):
+        """Get the device setup state."""
+        return self._remote_setup
+
+    @property
+    def device_type(self):
+        """Get the device type of the Sky Q box."""
+        return self._device_type
+
+    @property
+    def circuit_breaker(self):
+        """Get the circuit breaker tracking whether the Sky Q box is reachable."""
+        return self._device_access.circuit_breaker
+
+    async def setup(self):
+        """Retrieve the device information from the SkyQ box."""
+        await self._setup_remote()
+        return self._remote_setup
+
+    async def close(self):
+        """Close the pooled connections to the SkyQ box."""
+        await self._device_access.close()
+
+    async def power_status(self) -> str:
+        """Get the power status of the Sky Q box."""
+        if not self._remote_setup and self.circuit_breaker.state == CIRCUIT_CLOSED:
+            await self._setup_remote()
+
+        system_info = await self._device_access.retrieve_information(
+            REST_PATH_SYSTEMINFO
+        )
+        return self._device_information.build_power_status(system_info)
+
+    async def get_device_information(self):
+        """Get the device information from the SkyQ box."""
+        if self._remote_config.device_info and not self._override_country:
+            return self._remote_config.device_info
+
+        device_info, system_info, time_info = await asyncio.gather(
+            self._device_access.retrieve_information(REST_PATH_DEVICEINFO),
+            self._device_access.retrieve_information(REST_PATH_SYSTEMINFO),
+            self._device_access.retrieve_information(REST_SYSTEM_TIME),
+        )
+        if not device_info or not system_info or not time_info:
+            return None
+
+        device = self._device_information.build_device_information(
+            device_info, system_info, time_info, self._override_country
+        )
+        if not device:
+            return None
+
+        self._remote_config.set_device_info(device)
+        return device
+
+    async def get_current_state(self):
+        """Get current state of the SkyQ box."""
+        if not self._remote_setup and self.circuit_breaker.state == CIRCUIT_CLOSED:
+            await self._setup_remote()
+
+        if self._device_type in UNSUPPORTED_DEVICES:
+            return TransportInfo(SKY_STATE_UNSUPPORTED, None, None)
+
+        response = await self._device_access.call_sky_soap_service(
+            UPNP_GET_TRANSPORT_INFO
+        )
+        return self._device_information.build_transport_information(response)
+
+    async def get_active_application(self):
+        """Get the active application on Sky Q box."""
+        if not self._app_information:
+            self._app_information = AppInformation(self._remote_config)
+
+        apps = await self._device_access.call_sky_web_socket(WS_CURRENT_APPS)
+        if not self._app_information.app_titles_loaded:
+            self._app_information.load_app_titles(
+                await self._device_access.retrieve_information(REST_PATH_APPS)
+            )
+
+        return self._app_information.build_active_application(apps)
+
+    async def get_current_media(self):
+        """Get the currently playing media on the SkyQ box."""
+        if not self._media_information:
+            self._media_information = MediaInformation(self._remote_config)
+
+        response = await self._device_access.call_sky_soap_service(
+            UPNP_GET_MEDIA_INFO
+        )
+        media_source = self._media_information.parse_media_response(response)
+        if media_source is None:
+            return None
+
+        sid, pvrid, live = media_source
+        channel_node = await self._get_channel_node(sid) if live else None
+        return self._media_information.build_media(sid, pvrid, live, channel_node)
+
+    async def get_epg_data(self, sid, epg_date, days=2):
+        """Get EPG data for the specified channel/date."""
+        channel_epg, _ = await self._get_epg_data(sid, epg_date, days)
+        return channel_epg
+
+    async def _get_epg_data(self, sid, epg_date, days):
+        if not self._channel_epg_information:
+            self._channel_epg_information = ChannelEPGInformation(self._remote_config)
+
+        programmes = set()
+        complete = True
+        if channel_node := await self._get_channel_node(sid):
+            days_programmes = await asyncio.gather(
+                *(
+                    self._get_day_programmes(
+                        sid, epg_date + timedelta(days=day), channel_node["channel"]
+                    )
+                    for day in range(days)
+                )
+            )
+            # Days after the first empty or failed day are dropped
+            for programmes_data in days_programmes:
+                if programmes_data is None:
+                    complete = False
+                    break
+                if len(programmes_data) > 0:
+                    programmes = programmes.union(programmes_data)
+                else:
+                    break
+
+        channel_epg = self._channel_epg_information.build_channel_epg(
+            sid, channel_node, programmes
+        )
+        return channel_epg, complete
+
+    async def get_epg_bulk(self, sids, epg_date, days=2):
+        """Get EPG data for many channels, yielding (sid, epg, error) as each ends."""
+        semaphore = asyncio.Semaphore(EPG_BULK_WORKERS)
+
+        async def get_channel_epg(sid):
+            async with semaphore:
+                try:
+                    channel_epg, complete = await self._get_epg_data(
+                        sid, epg_date, days
+                    )
+                except Exception as err:  # pylint: disable=broad-except
+                    _LOGGER.exception(
+                        "X0010AR - EPG not available: %s : %s : %s",
+                        self._host,
+                        sid,
+                        err,
+                    )
+                    return sid, None, f"{type(err).__name__}: {err}"
+            return sid, channel_epg, epg_error(channel_epg, complete)
+
+        channel_requests = [asyncio.ensure_future(get_channel_epg(sid)) for sid in sids]
+        try:
+            for channel_request in asyncio.as_completed(channel_requests):
+                yield await channel_request
+        finally:
+            # Don't fetch the rest if the caller stops early
+            for channel_request in channel_requests:
+                channel_request.cancel()
+
+    async def get_recordings(self, status=ALLRECORDINGS, limit=1000, offset=0):
+        """Get the list of available Recordings."""
+        if not self._recordings_information:
+            self._recordings_information = RecordingsInformation(self._remote_config)
+
+        resp = await self._device_access.retrieve_information(
+            REST_RECORDINGS_LIST.format(limit, offset)
+        )
+        return self._recordings_information.build_recordings(resp, status)
+
+    async def press(self, sequence):
+        """Issue the specified sequence of commands to SkyQ box."""
+        return await self._device_access.press(sequence)
+
+    def set_key_timing(self, min_gap=None, profile=None):
+        """Tune the gaps left between keys when pressing a sequence."""
+        self._device_access.key_sequencer.set_timing(min_gap, profile)
+
+    def set_overrides(
+        self,
+        override_country=None,
+        test_channel=None,
+        json_port=None,
+        port=None,
+        schedule_url=None,
+    ):
+        """Override various items."""
+        if override_country:
+            self._override_country = override_country
+        if test_channel:
+            self._remote_config.test_channel = test_channel
+        if json_port:
+            self._remote_config.json_port = json_port
+        if port:
+            self._remote_config.port = port
+        if schedule_url:
+            self._remote_config.schedule_url = schedule_url
+
+    async def _setup_remote(self):
+        device_info = await self.get_device_information()
+        if not device_info:
+            return
+
+        self._remote_setup = True
+        self._device_type = self._remote_config.device_info.deviceType
+        if self._device_type not in UNSUPPORTED_DEVICES:
+            self._remote_config.device_access.discover_soap_control_url()
+
+    async def _get_channel_node(self, sid):
+        if not self._channel_information:
+            self._channel_information = ChannelInformation(self._remote_config)
+
+        channel_node = self._channel_information.find_channel_node(sid)
+        if not channel_node:
+            self._channel_information.load_channels(
+                await self._device_access.retrieve_information(
+                    self._channel_information.channel_list_path
+                )
+            )
+            channel_node = self._channel_information.find_channel_node(sid)
+        return channel_node
+
+    async def _get_day_programmes(self, sid, epg_date, channel_name):
+        key = self._channel_epg_information.epg_store_key(sid, epg_date, channel_name)
+
+        async def fetch():
+            return self._channel_epg_information.build_programmes(
+                await self._get_day_epg_data(sid, epg_date), channel_name
+            )
+
+        try:
+            return await self._remote_config.epg_store.get_day_async(key, fetch)
+        except (
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            ValueError,
+            KeyError,
+        ) as err:
+            _LOGGER.warning(
+                "W0010AR - Schedule not available: %s : %s : %s : %s",
+                self._host,
+                sid,
+                epg_date.strftime("%Y%m%d"),
+                err,
+            )
+            return None
+
+    async def _get_day_epg_data(self, sid, epg_date):
+        epg_url, headers = self._channel_epg_information.build_schedule_request(
+            sid, epg_date
+        )
+        _LOGGER.debug("Channel Call - %s - %s", self._host, epg_url)
+        resp = await self._device_access.fetch_json(epg_url, headers, EPG_TIMEOUT)
+        if resp is None:
+            # Not the same as a day with no programmes, so it isn't stored
+            raise ValueError(f"Schedule request failed: {epg_url}")
+        return resp["schedule"]
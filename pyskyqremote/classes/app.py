@@ -3,7 +3,13 @@
 import json
 from dataclasses import dataclass, field
 
-from ..const import APP_EPG, APP_STATUS_VISIBLE, REST_PATH_APPS, WS_CURRENT_APPS
+from ..const import (
+    APP_EPG,
+    APP_STATUS_VISIBLE,
+    CACHE_APPS,
+    REST_PATH_APPS,
+    WS_CURRENT_APPS,
+)
 
 
 class AppInformation:
@@ -13,29 +19,77 @@ class AppInformation:
         """Initialise the app information class."""
         self._device_access = remote_config.device_access
         self._current_app = APP_EPG
-        self._apps = {}
+        self._apps = remote_config.app_titles
+        self._cache_stats = remote_config.cache_stats[CACHE_APPS]
+        self._subscription = None
+        self._listeners = []
 
     def get_active_application(self):
         """Get the active application on Sky Q box."""
+        if self._subscription and self._subscription.connected:
+            return App(self._current_app, self._get_app_title(self._current_app))
+
+        apps = None
         try:
-            if apps := self._device_access.call_sky_web_socket(WS_CURRENT_APPS):
+            apps = self._device_access.call_sky_web_socket(WS_CURRENT_APPS)
+            if not self.app_titles_loaded:
+                self.load_app_titles(
+                    self._device_access.retrieve_information(REST_PATH_APPS)
+                )
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+        return self.build_active_application(apps)
+
+    def build_active_application(self, apps):
+        """Build the active application from an apps status message."""
+        try:
+            if apps:
                 self._current_app = next(
                     a for a in apps["apps"] if a["status"] == APP_STATUS_VISIBLE
                 )["appId"]
-
-            return App(self._current_app, self._get_app_title(self._current_app))
         except Exception:  # pylint: disable=broad-except
-            return App(self._current_app, self._get_app_title(self._current_app))
+            pass
+
+        return App(self._current_app, self._get_app_title(self._current_app))
+
+    def subscribe(self, callback=None):
+        """Keep the active application updated from the app status pushes."""
+        if callback:
+            self._listeners.append(callback)
+        if not self.app_titles_loaded:
+            self.load_app_titles(
+                self._device_access.retrieve_information(REST_PATH_APPS)
+            )
+        self._subscription = self._device_access.subscribe_sky_web_socket(
+            WS_CURRENT_APPS, self._on_apps_status
+        )
+
+    @property
+    def app_titles_loaded(self):
+        """Return whether the application titles have been loaded."""
+        return len(self._apps) > 0
+
+    def load_app_titles(self, apps):
+        """Load the application titles returned by the SkyQ box."""
+        if not apps:
+            return
+        for app in apps["apps"]:
+            self._apps[app["appId"]] = app["title"]
+
+    def _on_apps_status(self, apps):
+        previous_app = self._current_app
+        app = self.build_active_application(apps)
+        if app.appId != previous_app:
+            for listener in list(self._listeners):
+                listener(app)
 
     def _get_app_title(self, appid):
-        if len(self._apps) == 0:
-            apps = self._device_access.retrieve_information(REST_PATH_APPS)
-            if not apps:
-                return None
-            for app in apps["apps"]:
-                self._apps[app["appId"]] = app["title"]
-
-        return self._apps[appid] if appid in self._apps else None
+        if appid in self._apps:
+            self._cache_stats.hit()
+            return self._apps[appid]
+        self._cache_stats.miss()
+        return None
 
 
 @dataclass
@@ -0,0 +1,356 @@
+"""SKY Q Remote Utilities for asyncio."""
+import asyncio
+import logging
+import time
+from http import HTTPStatus
+
+import aiohttp
+
+from ..const import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_FAILURE_THRESHOLD,
+    COMMANDS,
+    HTTP_TIMEOUT,
+    REMOTE_TIMEOUT,
+    REST_BASE_URL,
+    REST_DELETE,
+    REST_GET,
+    REST_POOL_SIZE,
+    REST_POST,
+    SOAP_DESCRIPTION_BASE_URL,
+    SOAP_DESCRIPTION_COUNT,
+    SOAP_DISCOVERY_BACKOFF_MAX,
+    SOAP_DISCOVERY_BACKOFF_MIN,
+    SOAP_DISCOVERY_WORKERS,
+    SOAP_TIMEOUT,
+    SOAP_USER_AGENT,
+    WS_BASE_URL,
+)
+from .circuitbreaker import CircuitBreaker
+from .deviceaccess import (
+    SOAP_REQUESTS,
+    build_soap_control_url,
+    build_soap_request,
+    parse_soap_response,
+)
+from .keysequence import KeySequencer
+from .remotecontrol import COMMAND_FRAMES, build_command_frames
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncDeviceAccess:
+    """Set up the device for access from an asyncio event loop."""
+
+    def __init__(
+        self,
+        host,
+        json_port,
+        port,
+        pool_size=REST_POOL_SIZE,
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+    ):
+        """Initialise the utility setup."""
+        self._host = host
+        self.json_port = json_port
+        self.port = port
+        self.ipaddress = None
+        self._pool_size = pool_size
+        self._session = None
+        self._soap_discovery = None
+        self._soap_backoff = SOAP_DISCOVERY_BACKOFF_MIN
+        self._soap_retry_at = 0
+        self.circuit_breaker = CircuitBreaker(host, failure_threshold)
+        self.key_sequencer = KeySequencer(host)
+
+    async def close(self):
+        """Close the pooled connections to the SkyQ box."""
+        if self._soap_discovery and not self._soap_discovery.done():
+            self._soap_discovery.cancel()
+            self._soap_discovery = None
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def retrieve_information(self, rest_path, call_type=REST_GET):
+        """Retrieve information from the SkyQ box."""
+        if not self.circuit_breaker.allow_request():
+            return None
+        try:
+            if call_type == REST_GET:
+                response = await self.http_json(rest_path)
+            elif call_type == REST_POST:
+                response = await self.http_json_post(rest_path)
+            elif call_type == REST_DELETE:
+                response = await self.http_json_delete(rest_path)
+            else:
+                return None
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            self.circuit_breaker.record_failure()
+            return None
+        except aiohttp.ClientError:
+            return None
+        self.circuit_breaker.record_success()
+        return response
+
+    async def call_sky_web_socket(self, method):
+        """Make a websocket call to the sky box."""
+        _LOGGER.debug("WS Call - %s - %s", self._host, method)
+        try:
+            return await asyncio.wait_for(
+                self._receive_web_socket(WS_BASE_URL.format(self._host, method)),
+                HTTP_TIMEOUT,
+            )
+        except asyncio.TimeoutError as err:
+            _LOGGER.warning(
+                "W0010ADA - Websocket call failed: %s : %s : %s",
+                self._host,
+                method,
+                err,
+            )
+            return {"url": None, "status": "Error"}
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.exception(
+                "X0020ADA - Error occurred: %s : %s : %s", self._host, method, err
+            )
+            return None
+
+    async def call_sky_soap_service(self, method):
+        """Make a SOAP call to the sky box."""
+        if not self.circuit_breaker.allow_request():
+            return None
+        soap_control_url = await asyncio.shield(self.discover_soap_control_url())
+        if not soap_control_url:
+            _LOGGER.warning(
+                "W0020ADA - No Control URL, SOAP call not made: %s : %s ",
+                self._host,
+                method,
+            )
+            return None
+        _LOGGER.debug("SOAP Call - %s : %s", self._host, method)
+        try:
+            payload, headers = SOAP_REQUESTS.get(method) or build_soap_request(method)
+            async with self._get_session().post(
+                soap_control_url,
+                headers=headers,
+                data=payload,
+                timeout=aiohttp.ClientTimeout(total=SOAP_TIMEOUT),
+            ) as resp:
+                self.circuit_breaker.record_success()
+                if resp.status == HTTPStatus.OK:
+                    return parse_soap_response(await resp.text(), method)
+                return None
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            self.circuit_breaker.record_failure()
+            return None
+        except aiohttp.ClientError:
+            return None
+
+    def discover_soap_control_url(self):
+        """Start discovery of the SOAP control url in the background, if needed."""
+        if self._soap_discovery:
+            return self._soap_discovery
+        if (
+            not self.ipaddress
+            or self.circuit_breaker.state != CIRCUIT_CLOSED
+            or time.monotonic() < self._soap_retry_at
+        ):
+            # Not set up yet, not reachable or failed recently, so don't start
+            # a discovery that is likely to fail
+            discovery = asyncio.get_running_loop().create_future()
+            discovery.set_result(None)
+            return discovery
+        self._soap_discovery = asyncio.ensure_future(self._run_soap_discovery())
+        return self._soap_discovery
+
+    async def http_json(self, path, headers=None) -> str:
+        """Make an HTTP get call to the sky box."""
+        _LOGGER.debug("HTTP Get Call - %s - %s", self._host, path)
+        return await self.fetch_json(
+            REST_BASE_URL.format(self._host, self.json_port, path), headers
+        )
+
+    async def http_json_post(self, path, headers=None) -> str:
+        """Make an HTTP post call to the sky box."""
+        _LOGGER.debug("HTTP Post Call - %s - %s", self._host, path)
+        async with self._get_session().post(
+            REST_BASE_URL.format(self._host, self.json_port, path),
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+            headers=headers,
+        ) as response:
+            return response.status
+
+    async def http_json_delete(self, path, headers=None) -> str:
+        """Make an HTTP delete call to the sky box."""
+        _LOGGER.debug("HTTP Delete Call - %s - %s", self._host, path)
+        async with self._get_session().delete(
+            REST_BASE_URL.format(self._host, self.json_port, path),
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+            headers=headers,
+        ) as response:
+            return response.status
+
+    async def fetch_json(self, url, headers=None, timeout=HTTP_TIMEOUT):
+        """Make an HTTP get call and decode the JSON response."""
+        async with self._get_session().get(
+            url,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+            headers=headers,
+        ) as response:
+            if response.status != HTTPStatus.OK:
+                return None
+            return await response.json(content_type=None)
+
+    async def send_command(self, port, code):
+        """Send a command to the sky box."""
+        if not self.circuit_breaker.allow_request():
+            _LOGGER.debug(
+                "D0030ADA - Box not reachable, command not sent: %s : %s",
+                self._host,
+                code,
+            )
+            return
+        _LOGGER.debug("Socket Call - %s - %s", self._host, code)
+        try:
+            await asyncio.wait_for(self._remote_handshake(port, code), REMOTE_TIMEOUT)
+            self.circuit_breaker.record_success()
+        except asyncio.TimeoutError:
+            self.circuit_breaker.record_failure()
+            _LOGGER.error(
+                "E0010ADA - Timeout error sending command: %s : %s", self._host, code
+            )
+        except OSError as err:
+            self.circuit_breaker.record_failure()
+            _LOGGER.exception(
+                "X0040ADA - Failed to connect to client when sending command: %s : %s",
+                self._host,
+                err,
+            )
+
+    async def press(self, sequence):
+        """Issue the specified sequence of commands to SkyQ box."""
+        commands = self.key_sequencer.validate(sequence)
+        if commands is None:
+            return False
+
+        last = len(commands) - 1
+        for index, command in enumerate(commands):
+            start = time.monotonic()
+            await self.send_command(self.port, COMMANDS[command])
+            sent = time.monotonic()
+            gap_time = None
+            if index < last:
+                await asyncio.sleep(self.key_sequencer.gap_after(command))
+                gap_time = time.monotonic() - sent
+            self.key_sequencer.record(command, sent - start, gap_time)
+
+        return True
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=self._pool_size)
+            )
+        return self._session
+
+    async def _receive_web_socket(self, url):
+        async with self._get_session().ws_connect(url) as websock:
+            return await websock.receive_json()
+
+    async def _remote_handshake(self, port, code):
+        frames = COMMAND_FRAMES.get(code) or build_command_frames(code)
+        reader, writer = await asyncio.open_connection(self._host, port)
+        try:
+            strlen = 12
+            while data := await reader.read(1024):
+                if len(data) < 24:
+                    writer.write(data[:strlen])
+                    strlen = 1
+                else:
+                    writer.writelines(frames)
+                    await writer.drain()
+                    break
+                await writer.drain()
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    async def _run_soap_discovery(self):
+        soap_control_url = None
+        try:
+            soap_control_url = await self._get_soap_control_url()
+        finally:
+            if soap_control_url:
+                self._soap_backoff = SOAP_DISCOVERY_BACKOFF_MIN
+            elif self._soap_discovery is asyncio.current_task():
+                # e.g. the box is still booting, so discover again later
+                self._soap_discovery = None
+                self._soap_retry_at = time.monotonic() + self._soap_backoff
+                self._soap_backoff = min(
+                    self._soap_backoff * 2, SOAP_DISCOVERY_BACKOFF_MAX
+                )
+        return soap_control_url
+
+    async def _get_soap_control_url(self):
+        """Get the soapcontrourl for the SkyQ box."""
+        semaphore = asyncio.Semaphore(SOAP_DISCOVERY_WORKERS)
+
+        async def probe(url_index):
+            async with semaphore:
+                return await self._get_soap_control_url_item(url_index)
+
+        soap_control_url = None
+        probes = [
+            asyncio.ensure_future(probe(url_index))
+            for url_index in range(SOAP_DESCRIPTION_COUNT)
+        ]
+        try:
+            # Check in index order, so the lowest matching description wins
+            for pending_probe in probes:
+                if soap_control_url := (await pending_probe)["url"]:
+                    break
+        finally:
+            for pending_probe in probes:
+                pending_probe.cancel()
+
+        if not soap_control_url:
+            _LOGGER.warning(
+                "W0030ADA - Soap Control URL not available - %s", self._host
+            )
+
+        return soap_control_url
+
+    async def _get_soap_control_url_item(self, description_index):
+        """Get the sky control url."""
+        description_url = SOAP_DESCRIPTION_BASE_URL.format(
+            self.ipaddress, description_index
+        )
+        headers = {"User-Agent": SOAP_USER_AGENT}
+        empty_return = {"url": None, "status": "Not Found"}
+        try:
+            async with self._get_session().get(
+                description_url,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=SOAP_TIMEOUT),
+            ) as resp:
+                if resp.status == HTTPStatus.OK:
+                    return (
+                        build_soap_control_url(await resp.text(), self.ipaddress)
+                        or empty_return
+                    )
+                return empty_return
+        except asyncio.TimeoutError:
+            _LOGGER.debug(
+                "D0020ADA - Control URL not accessible: %s : %s",
+                self._host,
+                description_url,
+            )
+            return {"url": None, "status": "Error"}
+        except aiohttp.ClientError as err:
+            _LOGGER.exception("X0050ADA - Connection error: %s : %s", self._host, err)
+            return empty_return
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.exception(
+                "X0060ADA - Other error occurred: %s : %s", self._host, err
+            )
+            return empty_return
@@ -4,8 +4,9 @@ import json
 from dataclasses import dataclass, field
 from operator import attrgetter
 
-from ..const import AUDIO, CHANNEL_IMAGE_URL, REST_CHANNEL_LIST, VIDEO
+from ..const import AUDIO, CACHE_CHANNELS, CHANNEL_IMAGE_URL, REST_CHANNEL_LIST, VIDEO
 from ..const_test import TEST_CHANNEL_LIST
+from .channellineup import ChannelLineup
 
 
 class ChannelInformation:
@@ -16,19 +17,21 @@ class ChannelInformation:
         self._remote_config = remote_config
         self._device_access = remote_config.device_access
         self._test_channel = remote_config.test_channel
-        self._channels = []
-        self._bouquet = remote_config.device_info.bouquet
-        self._subbouquet = remote_config.device_info.subbouquet
+        self._lineups = remote_config.channel_lineups
+        self._cache_stats = remote_config.cache_stats[CACHE_CHANNELS]
+        if remote_config.channels and not self._test_channel:
+            # e.g. restored from a snapshot
+            self._lineups.seed(self._lineup_key, remote_config.channels)
 
     def get_channel_list(self):
         """Get Channel list for Sky Q box."""
-        self._channels = self._get_channels()
-        if not self._channels:
+        lineup = self._get_lineup()
+        if not lineup or not lineup.services:
             return None
 
         channelitems = set()
 
-        for channel in self._channels:
+        for channel in lineup.services:
             channel = Channel(
                 channel["c"], channel["t"], channel["sid"], None, sf=channel["sf"]
             )
@@ -45,12 +48,13 @@ class ChannelInformation:
         if not channel_no.isnumeric():
             return None
 
-        if not self._channels:
-            self._channels = self._get_channels()
-
-        try:
-            channel = next(c for c in self._channels if c["c"] == channel_no)
-        except StopIteration:
+        lineup = self._get_lineup()
+        channel = lineup.find_number(channel_no) if lineup else None
+        if not channel:
+            # The channels may have changed since they were loaded
+            lineup = self._refresh_lineup()
+            channel = lineup.find_number(channel_no) if lineup else None
+        if not channel:
             return None
 
         channelno = channel["c"]
@@ -72,34 +76,75 @@ class ChannelInformation:
         sid,
     ):
         """Retrieve the channel node for the given sid."""
-        channel_node = self._get_node_from_channels(sid)
-
-        if not channel_node:
+        channel_node = self.find_channel_node(sid)
+        if channel_node:
+            self._cache_stats.hit()
+        else:
+            self._cache_stats.miss()
             # Load the channel list for the first time.
             # It's also possible the channels may have changed since last HA restart,
             # so reload them
-            self._channels = self._get_channels()
-            channel_node = self._get_node_from_channels(sid)
+            self._refresh_lineup()
+            channel_node = self.find_channel_node(sid)
+        return channel_node
+
+    def find_channel_node(self, sid):
+        """Find the channel node for the given sid in the loaded channels."""
+        lineup = self._current_lineup()
+        channel_node = lineup.find_sid(sid) if lineup else None
         return (
             {"channel": channel_node["t"], "channelno": channel_node["c"]}
             if channel_node
             else None
         )
 
+    @property
+    def channel_list_path(self):
+        """Return the REST path for the channel list of this box."""
+        return REST_CHANNEL_LIST.format(*self._lineup_key)
+
+    def load_channels(self, channels):
+        """Load the channel services returned by the SkyQ box."""
+        if self._test_channel:
+            return
+        if services := self._services_from_response(channels):
+            self._remote_config.channels = self._lineups.load(
+                self._lineup_key, services
+            ).services
+
+    @property
+    def _lineup_key(self):
+        device_info = self._remote_config.device_info
+        return (device_info.bouquet, device_info.subbouquet)
+
+    def _current_lineup(self):
+        """Return the lineup held for this box, without fetching it."""
+        if self._test_channel:
+            return ChannelLineup(TEST_CHANNEL_LIST)
+        return self._lineups.get(self._lineup_key)
+
+    def _get_lineup(self):
+        """Return the lineup for this box, fetching it if missing or expired."""
+        return self._current_lineup() or self._refresh_lineup()
+
+    def _refresh_lineup(self):
+        if self._test_channel:
+            return ChannelLineup(TEST_CHANNEL_LIST)
+        lineup = self._lineups.refresh(self._lineup_key, self._get_channels)
+        if lineup:
+            self._remote_config.channels = lineup.services
+        return lineup
+
     def _get_channels(self):
         """Get the list of channels from the Sky Q box."""
-        # This is here because otherwise I can never validate code for a foreign device
+        channels = self._device_access.retrieve_information(self.channel_list_path)
+        return self._services_from_response(channels)
+
+    def _services_from_response(self, channels):
         if self._test_channel:
             return TEST_CHANNEL_LIST
-
-        channels = self._device_access.retrieve_information(
-            REST_CHANNEL_LIST.format(self._bouquet, self._subbouquet)
-        )
         return channels["services"] if channels and "services" in channels else []
 
-    def _get_node_from_channels(self, sid):
-        return next((s for s in self._channels if s["sid"] == str(sid)), None)
-
 
 @dataclass
 class ChannelList:
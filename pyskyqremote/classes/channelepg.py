@@ -2,21 +2,27 @@
 
 import json
 import logging
-from collections import OrderedDict
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 
 import requests
 
 from ..const import (
+    CACHE_EPG,
     CONST_DATE_FORMAT,
-    EPG_TIMEOUT,
+    EPG_BULK_WORKERS,
+    EPG_ERROR_INCOMPLETE,
+    EPG_ERROR_NO_CHANNEL,
+    EPG_ERROR_NO_DATA,
+    EPG_FETCH_WORKERS,
     LIVE_IMAGE_URL,
     RESPONSE_OK,
-    SCHEDULE_URL,
     SKY_STATUS_LIVE,
 )
 from .channel import ChannelInformation, build_channel_image_url
+from .lrucache import LRUCache
 from .programme import Programme
 
 _LOGGER = logging.getLogger(__name__)
@@ -31,24 +37,175 @@ class ChannelEPGInformation:
         self._device_access = remote_config.device_access
         self._remote_country = remote_config.remote_country
         self._test_channel = remote_config.test_channel
-        self._epg_cache_len = remote_config.epg_cache_len
-        self._epg_cache = OrderedDict()
+        self._cache_stats = remote_config.cache_stats[CACHE_EPG]
+        self._epg_cache = LRUCache(
+            remote_config.epg_cache_len,
+            remote_config.epg_cache_ttl,
+            remote_config.epg_cache_bytes,
+            self._cache_stats,
+        )
         self._channel = None
         self._channel_information = None
+        self._lock = threading.Lock()
 
     def get_epg_data(self, sid, epg_date, days=2):
         """Get EPG data for the specified channel/date."""
-        epg = f'{sid} {days:0>2d} {epg_date.strftime("%Y%m%d")}'
+        epg = _epg_key(sid, epg_date, days)
+        if cached := self._get_cached_channel(sid, epg):
+            return cached
 
-        if sid in self._epg_cache and self._epg_cache[sid]["epg"] == epg:
-            return self._epg_cache[sid]["channel"]
+        programmes = set()
+        complete = True
 
+        if channel_node := self._get_channel_node(sid):
+            # Days already in the EPG store aren't fetched again. Days after the
+            # first empty or failed day are dropped
+            for programmes_data in self._get_days_data(
+                sid, channel_node["channel"], _epg_dates(epg_date, days)
+            ):
+                if programmes_data is None:
+                    complete = False
+                    break
+                if len(programmes_data) > 0:
+                    programmes = programmes.union(programmes_data)
+                else:
+                    break
+
+        channel = self.build_channel_epg(sid, channel_node, programmes)
+        if complete:
+            # Don't cache missing days, so the next call tries them again
+            self._cache_channel(sid, epg, channel)
+        return channel
+
+    def get_epg_bulk(self, sids, epg_date, days=2):
+        """Get EPG data for many channels, yielding (sid, epg, error) as each ends."""
+        sids = list(sids)
+        batch_size = max(self._remote_config.epg_batch_size, 1)
+        executor = ThreadPoolExecutor(
+            max_workers=EPG_BULK_WORKERS,
+            thread_name_prefix=f"skyq-epg-{self._remote_config.host}",
+        )
+        batch_requests = [
+            executor.submit(
+                self._get_epg_batch, sids[index : index + batch_size], epg_date, days
+            )
+            for index in range(0, len(sids), batch_size)
+        ]
+        try:
+            for batch_request in as_completed(batch_requests):
+                yield from batch_request.result()
+        finally:
+            # Don't fetch the rest if the caller stops early
+            for batch_request in batch_requests:
+                batch_request.cancel()
+            executor.shutdown(wait=False)
+
+    def _get_epg_batch(self, sids, epg_date, days):
+        """Get the EPG of a batch of channels, a schedule request per day for all."""
+        try:
+            return self._get_epg_batch_data(sids, epg_date, days)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.exception(
+                "X0010CE - EPG not available: %s : %s : %s",
+                self._remote_config.host,
+                sids,
+                err,
+            )
+            return [(sid, None, f"{type(err).__name__}: {err}") for sid in sids]
+
+    def _get_epg_batch_data(self, sids, epg_date, days):
+        results = {}
+        channel_nodes = {}
+        programmes = {}
+        for sid in sids:
+            if cached := self._get_cached_channel(sid, _epg_key(sid, epg_date, days)):
+                results[sid] = (sid, cached, epg_error(cached))
+            elif channel_node := self._get_channel_node(sid):
+                channel_nodes[sid] = channel_node
+                programmes[sid] = set()
+            else:
+                channel = self.build_channel_epg(sid, None, set())
+                self._cache_channel(sid, _epg_key(sid, epg_date, days), channel)
+                results[sid] = (sid, channel, epg_error(channel))
+
+        channel_names = {sid: node["channel"] for sid, node in channel_nodes.items()}
+        incomplete = set()
+        for day in _epg_dates(epg_date, days):
+            if not channel_names:
+                break
+            for sid, programmes_data in self._get_batch_day_data(
+                channel_names, day
+            ).items():
+                if programmes_data:
+                    programmes[sid] = programmes[sid].union(programmes_data)
+                    continue
+                # Days after the first empty or failed day are dropped
+                del channel_names[sid]
+                if programmes_data is None:
+                    incomplete.add(sid)
+
+        for sid, channel_programmes in programmes.items():
+            channel = self.build_channel_epg(
+                sid, channel_nodes[sid], channel_programmes
+            )
+            complete = sid not in incomplete
+            if complete:
+                self._cache_channel(sid, _epg_key(sid, epg_date, days), channel)
+            results[sid] = (sid, channel, epg_error(channel, complete))
+        return [results[sid] for sid in sids]
+
+    def _get_batch_day_data(self, channel_names, epg_date):
+        """Get a day of programmes for each channel, None for a failed day."""
+        epg_store = self._remote_config.epg_store
+        day_programmes = {}
+        missing = {}
+        for sid, channel_name in channel_names.items():
+            key = self.epg_store_key(sid, epg_date, channel_name)
+            day_programmes[sid] = epg_store.lookup(key)
+            if day_programmes[sid] is None:
+                missing[sid] = key
+        if not missing:
+            return day_programmes
+
+        schedules = self._get_day_schedules(list(missing), epg_date)
+        if schedules is None:
+            # Every channel in the batch failed for the day, so none are stored
+            return day_programmes
+
+        for sid, key in missing.items():
+            schedule = schedules.get(str(sid))
+            day_programmes[sid] = self.build_programmes(
+                [schedule] if schedule else None, channel_names[sid]
+            )
+            epg_store.put(key, day_programmes[sid])
+        return day_programmes
+
+    def _get_cached_channel(self, sid, epg):
+        with self._lock:
+            cached = self._epg_cache.get(sid)
+            if cached and cached["epg"] == epg:
+                self._cache_stats.hit()
+                return cached["channel"]
+            self._cache_stats.miss()
+            return None
+
+    def _cache_channel(self, sid, epg, channel):
+        with self._lock:
+            self._channel = channel
+            self._epg_cache.put(sid, {"epg": epg, "channel": channel})
+
+    @property
+    def epg_cache(self):
+        """Return the cached channel EPGs, keyed by sid."""
+        with self._lock:
+            return self._epg_cache.items()
+
+    def build_channel_epg(self, sid, channel_node, programmes):
+        """Build the channel EPG from the channel node and its programmes."""
         channel_no = None
         channel_name = None
         channel_image_url = None
-        programmes = set()
-
-        if channel_node := self._get_channel_node(sid):
+        if channel_node:
             channel_no = channel_node["channelno"]
             channel_name = channel_node["channel"]
             channel_image_url = build_channel_image_url(
@@ -58,36 +215,60 @@ class ChannelEPGInformation:
                 self._remote_config.territory,
             )
 
-            for day in range(days):
-                programmes_data = self._get_data(
-                    sid, channel_name, epg_date + timedelta(days=day)
-                )
-                if len(programmes_data) > 0:
-                    programmes = programmes.union(programmes_data)
-                else:
-                    break
-
-        self._channel = ChannelEPG(
+        return ChannelEPG(
             sid, channel_no, channel_name, channel_image_url, sorted(programmes)
         )
-        self._epg_cache[sid] = {
-            "epg": epg,
-            "channel": self._channel,
-            "updatetime": datetime.now(timezone.utc),
-        }
-        self._epg_cache = OrderedDict(
-            sorted(
-                self._epg_cache.items(), key=lambda x: x[1]["updatetime"], reverse=True
+
+    def _get_days_data(self, sid, channel_name, epg_dates):
+        """Get the programmes for each day concurrently, None for a failed day."""
+        if len(epg_dates) <= 1:
+            return [self._get_data_or_none(sid, channel_name, day) for day in epg_dates]
+
+        with ThreadPoolExecutor(
+            max_workers=min(len(epg_dates), EPG_FETCH_WORKERS),
+            thread_name_prefix=f"skyq-epg-{self._remote_config.host}",
+        ) as executor:
+            return list(
+                executor.map(
+                    lambda day: self._get_data_or_none(sid, channel_name, day),
+                    epg_dates,
+                )
             )
-        )
-        while len(self._epg_cache) > self._epg_cache_len:
-            self._epg_cache.popitem(last=True)
 
-        return self._channel
+    def _get_data_or_none(self, sid, channel_name, epg_date):
+        try:
+            return self._get_data(sid, channel_name, epg_date)
+        except (requests.exceptions.RequestException, ValueError, KeyError) as err:
+            _LOGGER.warning(
+                "W0010CE - Schedule not available: %s : %s : %s : %s",
+                self._remote_config.host,
+                sid,
+                epg_date.strftime("%Y%m%d"),
+                err,
+            )
+            return None
 
     def _get_data(self, sid, channel_name, epg_date):
+        return self._remote_config.epg_store.get_day(
+            self.epg_store_key(sid, epg_date, channel_name),
+            lambda: self.build_programmes(
+                self._get_day_epg_data(sid, epg_date), channel_name
+            ),
+        )
+
+    def epg_store_key(self, sid, epg_date, channel_name):
+        """Build the key of a channel day in the shared EPG store."""
+        return (
+            self._remote_config.schedule_url,
+            self._remote_config.territory,
+            str(sid),
+            epg_date.strftime("%Y%m%d"),
+            channel_name,
+        )
+
+    def build_programmes(self, epg_data, channel_name):
+        """Build the programmes from a day of schedule service data."""
         programmes = set()
-        epg_data = self._get_day_epg_data(sid, epg_date)
         if epg_data is None:
             return programmes
 
@@ -135,18 +316,52 @@ class ChannelEPGInformation:
 
         return programmes
 
-    def _get_day_epg_data(self, sid, epg_date):
+    def build_schedule_request(self, sid, epg_date):
+        """Build the schedule service url and headers for a channel/day."""
         epg_date_str = epg_date.strftime("%Y%m%d")
 
-        epg_url = SCHEDULE_URL.format(sid, epg_date_str)
+        epg_url = self._remote_config.schedule_url.format(sid, epg_date_str)
         headers = {
             "x-skyott-territory": self._remote_config.territory,
             "x-skyott-provider": "SKY",
             "x-skyott-proposition": "SKYQ",
         }
+        return epg_url, headers
+
+    def _get_day_epg_data(self, sid, epg_date):
+        epg_url, headers = self.build_schedule_request(sid, epg_date)
         _LOGGER.debug("Channel Call - %s - %s", self._remote_config.host, epg_url)
-        resp = requests.get(epg_url, headers=headers, timeout=EPG_TIMEOUT)
-        return resp.json()["schedule"] if resp.status_code == RESPONSE_OK else None
+        resp = self._device_access.http_schedule(epg_url, headers)
+        if resp.status_code != RESPONSE_OK:
+            # Not the same as a day with no programmes, so it isn't cached
+            raise requests.exceptions.HTTPError(
+                f"Schedule request failed: {resp.status_code}", response=resp
+            )
+        return resp.json()["schedule"]
+
+    def _get_day_schedules(self, sids, epg_date):
+        """Get the schedules of several channels for a day keyed by sid, or None."""
+        epg_url, headers = self.build_schedule_request(
+            ",".join(str(sid) for sid in sids), epg_date
+        )
+        _LOGGER.debug("Channel Call - %s - %s", self._remote_config.host, epg_url)
+        try:
+            resp = self._device_access.http_schedule(epg_url, headers)
+            if resp.status_code != RESPONSE_OK:
+                raise requests.exceptions.HTTPError(
+                    f"Schedule request failed: {resp.status_code}", response=resp
+                )
+            schedules = resp.json()["schedule"]
+            return {str(schedule["sid"]): schedule for schedule in schedules}
+        except (requests.exceptions.RequestException, ValueError, KeyError) as err:
+            _LOGGER.warning(
+                "W0020CE - Schedule not available: %s : %s : %s : %s",
+                self._remote_config.host,
+                sids,
+                epg_date.strftime("%Y%m%d"),
+                err,
+            )
+            return None
 
     def _get_channel_node(self, sid):
         if not self._channel_information:
@@ -190,6 +405,25 @@ class ChannelEPG:
         return json.dumps(self, cls=_ChannelEPGJSONEncoder)
 
 
+def _epg_key(sid, epg_date, days):
+    return f'{sid} {days:0>2d} {epg_date.strftime("%Y%m%d")}'
+
+
+def _epg_dates(epg_date, days):
+    return [epg_date + timedelta(days=day) for day in range(days)]
+
+
+def epg_error(channel_epg, complete=True):
+    """Return why a channel EPG is missing or short, or None if it isn't."""
+    if channel_epg.channelname is None:
+        return EPG_ERROR_NO_CHANNEL
+    if not complete:
+        return EPG_ERROR_INCOMPLETE
+    if not channel_epg.programmes:
+        return EPG_ERROR_NO_DATA
+    return None
+
+
 def channel_epg_decoder(obj):
     """Decode channel object from json."""
     channelepg = json.loads(obj, object_hook=_json_decoder_hook)
@@ -0,0 +1,95 @@
+"""Registry of channel lineups shared by every SkyQ remote in the process."""
+import threading
+import time
+
+from ..const import (
+    CHANNEL_LINEUP_FETCH,
+    CHANNEL_LINEUP_MISS_REFRESH,
+    CHANNEL_LINEUP_TTL,
+)
+from .singleflight import SingleFlight
+
+
+class ChannelLineup:
+    """The channel services of a bouquet/subbouquet, indexed by sid and number."""
+
+    def __init__(self, services):
+        """Index the services returned by the SkyQ box."""
+        self.services = services
+        self.loaded = time.monotonic()
+        self._by_sid = {}
+        self._by_number = {}
+        for service in services:
+            self._by_sid.setdefault(service["sid"], service)
+            self._by_number.setdefault(service["c"], service)
+
+    @property
+    def age(self):
+        """Return the seconds since the lineup was loaded."""
+        return time.monotonic() - self.loaded
+
+    def find_sid(self, sid):
+        """Return the service for a sid, or None."""
+        return self._by_sid.get(str(sid))
+
+    def find_number(self, channel_no):
+        """Return the service for a channel number, or None."""
+        return self._by_number.get(channel_no)
+
+
+class ChannelLineupRegistry:
+    """Channel lineups keyed by bouquet/subbouquet, fetched once for every box."""
+
+    def __init__(
+        self, ttl=CHANNEL_LINEUP_TTL, miss_refresh=CHANNEL_LINEUP_MISS_REFRESH
+    ):
+        """Initialise the registry, empty."""
+        self.ttl = ttl
+        self.miss_refresh = miss_refresh
+        self._lock = threading.Lock()
+        self._lineups = {}
+        self._single_flight = SingleFlight()
+
+    def __len__(self):
+        """Return the number of lineups held."""
+        return len(self._lineups)
+
+    def get(self, key):
+        """Return the lineup for a bouquet/subbouquet, or None if missing or expired."""
+        lineup = self._lineups.get(key)
+        return lineup if lineup and lineup.age < self.ttl else None
+
+    def refresh(self, key, fetch):
+        """Fetch the lineup again, unless it was loaded in the last miss_refresh."""
+        lineup = self._lineups.get(key)
+        if lineup and lineup.age < self.miss_refresh:
+            return lineup
+
+        def fetch_and_load():
+            if services := fetch():
+                return self.load(key, services)
+            # Carry on with the lineup held, if any, while the box is unavailable
+            return self._lineups.get(key)
+
+        return self._single_flight.call((CHANNEL_LINEUP_FETCH, key), fetch_and_load)
+
+    def load(self, key, services):
+        """Hold the services for a bouquet/subbouquet."""
+        lineup = ChannelLineup(services)
+        with self._lock:
+            self._lineups[key] = lineup
+        return lineup
+
+    def seed(self, key, services):
+        """Hold previously saved services, unless a lineup is already held."""
+        with self._lock:
+            if key not in self._lineups:
+                self._lineups[key] = ChannelLineup(services)
+
+    def clear(self):
+        """Drop every lineup held."""
+        with self._lock:
+            self._lineups = {}
+
+
+SHARED_CHANNEL_LINEUPS = ChannelLineupRegistry()
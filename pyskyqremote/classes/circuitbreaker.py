@@ -0,0 +1,90 @@
+"""Circuit breaker for unreachable SkyQ boxes."""
+import logging
+import random
+import threading
+import time
+
+from ..const import (
+    CIRCUIT_BACKOFF_MAX,
+    CIRCUIT_BACKOFF_MIN,
+    CIRCUIT_CLOSED,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Stop calling a box after repeated connection failures, probing with backoff."""
+
+    def __init__(
+        self,
+        host,
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        backoff_min=CIRCUIT_BACKOFF_MIN,
+        backoff_max=CIRCUIT_BACKOFF_MAX,
+    ):
+        """Initialise the breaker, closed."""
+        self._host = host
+        self._failure_threshold = failure_threshold
+        self._backoff_min = backoff_min
+        self._backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._backoff = backoff_min
+        self._next_probe = 0
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+
+    @property
+    def retry_in(self):
+        """Return the seconds until the next probe is allowed, 0 when closed."""
+        if self.state == CIRCUIT_CLOSED:
+            return 0
+        return max(self._next_probe - time.monotonic(), 0)
+
+    def allow_request(self):
+        """Return whether a call to the box should be made."""
+        with self._lock:
+            if self.state == CIRCUIT_CLOSED:
+                return True
+            now = time.monotonic()
+            if now < self._next_probe:
+                return False
+            # Let a single probe through to see if the box is back, allowing
+            # another if this one never reports back
+            self.state = CIRCUIT_HALF_OPEN
+            self._next_probe = now + self._backoff
+            return True
+
+    def record_success(self):
+        """Record a successful call, closing the breaker."""
+        with self._lock:
+            if self.state != CIRCUIT_CLOSED:
+                _LOGGER.debug("D0010CB - Circuit closed: %s", self._host)
+            self.state = CIRCUIT_CLOSED
+            self.consecutive_failures = 0
+            self._backoff = self._backoff_min
+
+    def record_failure(self):
+        """Record a connection failure, opening the breaker if needed."""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == CIRCUIT_HALF_OPEN:
+                self._backoff = min(self._backoff * 2, self._backoff_max)
+            elif self.consecutive_failures < self._failure_threshold:
+                return
+            elif self.state == CIRCUIT_OPEN:
+                return
+
+            self.state = CIRCUIT_OPEN
+            self._next_probe = time.monotonic() + random.uniform(
+                self._backoff / 2, self._backoff
+            )
+            _LOGGER.debug(
+                "D0020CB - Circuit open after %s failures, next probe in %ss: %s",
+                self.consecutive_failures,
+                round(self.retry_in, 1),
+                self._host,
+            )
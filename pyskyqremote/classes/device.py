@@ -4,6 +4,7 @@ import ipaddress
 import json
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 
 from ..const import (
@@ -18,6 +19,7 @@ from ..const import (
     REST_SYSTEM_TIME,
     SKY_STATE_NOMEDIA,
     SKY_STATE_OFF,
+    SKY_STATE_ON,
     SKY_STATE_PAUSED,
     SKY_STATE_PLAYING,
     SKY_STATE_STANDBY,
@@ -42,6 +44,10 @@ class DeviceInformation:
     def get_transport_information(self):
         """Get the transport information from the SkyQ box."""
         response = self._device_access.call_sky_soap_service(UPNP_GET_TRANSPORT_INFO)
+        return self.build_transport_information(response)
+
+    def build_transport_information(self, response):
+        """Build the transport information from a GetTransportInfo response."""
         if response is not None:
             return TransportInfo(
                 response[CURRENT_TRANSPORT_STATE],
@@ -53,6 +59,15 @@ class DeviceInformation:
             SKY_STATE_OFF, DEFAULT_TRANSPORT_STATE, DEFAULT_TRANSPORT_SPEED
         )
 
+    def build_power_status(self, system_info):
+        """Build the power status from the system information."""
+        if system_info is None:
+            return SKY_STATE_OFF
+        if "activeStandby" in system_info and system_info["activeStandby"] is True:
+            return SKY_STATE_STANDBY
+
+        return SKY_STATE_ON
+
     def get_system_information(self):
         """Get the system information from the SkyQ box."""
         return self._device_access.retrieve_information(REST_PATH_SYSTEMINFO)
@@ -63,12 +78,29 @@ class DeviceInformation:
 
     def get_device_information(self, override_country):
         """Get the device information from the SkyQ box."""
-        device_info = self._device_access.retrieve_information(REST_PATH_DEVICEINFO)
-        if not device_info:
+        with ThreadPoolExecutor(
+            max_workers=3, thread_name_prefix=f"skyq-setup-{self._remote_config.host}"
+        ) as executor:
+            device_request = executor.submit(
+                self._device_access.retrieve_information, REST_PATH_DEVICEINFO
+            )
+            system_request = executor.submit(self.get_system_information)
+            time_request = executor.submit(self.get_system_time)
+            device_info = device_request.result()
+            system_info = system_request.result()
+            time_info = time_request.result()
+
+        if not device_info or not system_info or not time_info:
             return None
 
-        system_info = self.get_system_information()
-        time_info = self.get_system_time()
+        return self.build_device_information(
+            device_info, system_info, time_info, override_country
+        )
+
+    def build_device_information(
+        self, device_info, system_info, time_info, override_country
+    ):
+        """Build the device information from the SkyQ box responses."""
         as_version = device_info["ASVersion"]
         ip_address = device_info["IPAddress"]
         country_code = device_info["countryCode"]
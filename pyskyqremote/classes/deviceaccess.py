@@ -1,34 +1,68 @@
 """SKY Q Remote Utilities."""
+import html
 import json
 import logging
-import math
+import re
 import socket
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from http import HTTPStatus
 
 import requests
 import websocket
 import xmltodict
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import TimeoutError as Urllib3TimeoutError
+from urllib3.util.retry import Retry
 
 from ..const import (
-    COMMANDS,
-    CONNECT_TIMEOUT,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_OPEN,
+    CURRENT_TRANSPORT_STATE,
+    EPG_TIMEOUT,
     HTTP_TIMEOUT,
+    PRIORITY_INTERACTIVE,
     REST_BASE_URL,
     REST_DELETE,
     REST_GET,
+    REST_POOL_SIZE,
     REST_POST,
+    SCHEDULER_MAX_IN_FLIGHT,
     SKY_PLAY_URN,
     SKYCONTROL,
     SOAP_ACTION,
+    SOAP_CALL,
     SOAP_CONTROL_BASE_URL,
     SOAP_DESCRIPTION_BASE_URL,
+    SOAP_DESCRIPTION_COUNT,
+    SOAP_DISCOVERY_BACKOFF_MAX,
+    SOAP_DISCOVERY_BACKOFF_MIN,
+    SOAP_DISCOVERY_WORKERS,
     SOAP_PAYLOAD,
+    SOAP_POOL_SIZE,
     SOAP_RESPONSE,
     SOAP_TIMEOUT,
     SOAP_USER_AGENT,
+    TRACE_OK,
+    TRACE_REMOTE_ENDPOINT,
+    TRACE_REST,
+    TRACE_SOAP,
+    TRACE_TCP,
+    TRACE_WS,
+    UPNP_GET_MEDIA_INFO,
+    UPNP_GET_TRANSPORT_INFO,
+    UPNP_RESPONSE_FIELDS,
     WS_BASE_URL,
+    WS_CALL,
 )
+from .circuitbreaker import CircuitBreaker
+from .keysequence import KeySequencer
+from .remotecontrol import RemoteControlConnection
+from .scheduler import RequestScheduler, rest_priority, soap_priority
+from .singleflight import SingleFlight
+from .tracing import TransportTrace, endpoint_template
+from .websocketsubscription import WebSocketSubscription
 
 _LOGGER = logging.getLogger(__name__)
 UNDEFINED = "undefined"
@@ -37,61 +71,159 @@ UNDEFINED = "undefined"
 class DeviceAccess:
     """Set up the device for access."""
 
-    def __init__(self, host, json_port, port):
+    def __init__(
+        self,
+        host,
+        json_port,
+        port,
+        rest_pool_size=REST_POOL_SIZE,
+        soap_pool_size=SOAP_POOL_SIZE,
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        max_in_flight=SCHEDULER_MAX_IN_FLIGHT,
+        fixtures=None,
+    ):
         """Initialise the utility setup."""
         self._host = host
         self.json_port = json_port
         self.port = port
         self.ipaddress = None
         # _LOGGER.debug(f"Init device access - {self._host}")
-        self._soap_control_url = UNDEFINED
+        self._soap_discovery = None
+        self._soap_lock = threading.Lock()
+        self._soap_backoff = SOAP_DISCOVERY_BACKOFF_MIN
+        self._soap_retry_at = 0
+        self._rest_session = _build_session(rest_pool_size)
+        self._soap_session = _build_session(soap_pool_size)
+        self._subscriptions = {}
+        self._remote_control = None
+        self.circuit_breaker = CircuitBreaker(host, failure_threshold)
+        self.single_flight = SingleFlight()
+        self.scheduler = RequestScheduler(host, max_in_flight)
+        self._trace_hooks = []
+        self.fixtures = fixtures
+        self.key_sequencer = KeySequencer(
+            host,
+            lambda code: self.send_command(self.port, code),
+            self._current_transport_state,
+        )
+
+    def close(self):
+        """Close the pooled connections and subscriptions to the SkyQ box."""
+        if self._remote_control:
+            self._remote_control.close()
+        for subscription in self._subscriptions.values():
+            subscription.stop()
+        self._subscriptions = {}
+        self._rest_session.close()
+        self._soap_session.close()
 
     def retrieve_information(self, rest_path, call_type=REST_GET):
         """Retrieve information from the SkyQ box."""
+        if call_type != REST_GET:
+            return self._retrieve_information(rest_path, call_type)
+        return self.single_flight.call(
+            (REST_GET, rest_path),
+            lambda: self._retrieve_information(rest_path, call_type),
+        )
+
+    def _retrieve_information(self, rest_path, call_type):
+        if not self.circuit_breaker.allow_request():
+            return None
         try:
-            if call_type == REST_GET:
-                return self.http_json(rest_path)
-            if call_type == REST_POST:
-                return self.http_json_post(rest_path)
-            if call_type == REST_DELETE:
-                return self.http_json_delete(rest_path)
+            with self.scheduler.slot(rest_priority(rest_path)):
+                if call_type == REST_GET:
+                    response = self.http_json(rest_path)
+                elif call_type == REST_POST:
+                    response = self.http_json_post(rest_path)
+                elif call_type == REST_DELETE:
+                    response = self.http_json_delete(rest_path)
+                else:
+                    return None
         except (
             requests.exceptions.ConnectTimeout,
             requests.exceptions.ConnectionError,
             requests.exceptions.ReadTimeout,
         ):  # as err:
             # _LOGGER.debug(f"D0010U - Connection error: {self._host} : {err}")
+            self.circuit_breaker.record_failure()
             return None
+        self.circuit_breaker.record_success()
+        return response
         # except Exception as err:
         #     _LOGGER.exception(f"X0010DA - Error occurred: {self._host} : {err}")
         #     return None
 
     def call_sky_web_socket(self, method):
         """Make a websocket call to the sky box."""
+        return self.single_flight.call(
+            (WS_CALL, method), lambda: self._call_sky_web_socket(method)
+        )
+
+    def _call_sky_web_socket(self, method):
+        if not self.circuit_breaker.allow_request():
+            return None
         _LOGGER.debug("WS Call - %s - %s", self._host, method)
         try:
-            websock = websocket.create_connection(
-                WS_BASE_URL.format(self._host, method)
-            )
-            response = json.loads(websock.recv())
-            websock.close()
-            return response
+            with self.scheduler.slot():
+                response = self._traced_call(
+                    TRACE_WS, method, REST_GET, self._receive_web_socket, method
+                )
+            self.circuit_breaker.record_success()
+            return json.loads(response)
         except (TimeoutError) as err:
+            self.circuit_breaker.record_failure()
             _LOGGER.warning(
                 "W0010DA - Websocket call failed: %s : %s : %s", self._host, method, err
             )
             return {"url": None, "status": "Error"}
+        except OSError as err:
+            self.circuit_breaker.record_failure()
+            _LOGGER.debug(
+                "D0040DA - Websocket connection failed: %s : %s : %s",
+                self._host,
+                method,
+                err,
+            )
+            return None
         except Exception as err:  # pylint: disable=broad-except
             _LOGGER.exception(
                 "X0020DA - Error occurred: %s : %s : %s", self._host, method, err
             )
             return None
 
+    def _receive_web_socket(self, method):
+        url = WS_BASE_URL.format(self._host, method)
+        return self._fixture_exchange(
+            REST_GET, url, None, lambda: self._receive_web_socket_frame(url)
+        )
+
+    def _receive_web_socket_frame(self, url):
+        websock = websocket.create_connection(url)
+        try:
+            return websock.recv()
+        finally:
+            websock.close()
+
+    def subscribe_sky_web_socket(self, method, on_message):
+        """Keep a websocket to the sky box open, passing each message on."""
+        if method not in self._subscriptions:
+            self._subscriptions[method] = WebSocketSubscription(
+                self._host, method, on_message
+            )
+        self._subscriptions[method].start()
+        return self._subscriptions[method]
+
     def call_sky_soap_service(self, method):
         """Make a SOAP call to the sky box."""
-        if self._soap_control_url == UNDEFINED:
-            self._soap_control_url = self._get_soap_control_url()
-        if not self._soap_control_url:
+        return self.single_flight.call(
+            (SOAP_CALL, method), lambda: self._call_sky_soap_service(method)
+        )
+
+    def _call_sky_soap_service(self, method):
+        if not self.circuit_breaker.allow_request():
+            return None
+        soap_control_url = self.discover_soap_control_url().result()
+        if not soap_control_url:
             _LOGGER.warning(
                 "W0020DA - No Control URL, SOAP call not made: %s : %s ",
                 self._host,
@@ -100,31 +232,78 @@ class DeviceAccess:
             return None
         _LOGGER.debug("SOAP Call - %s : %s", self._host, method)
         try:
-            payload = SOAP_PAYLOAD.format(method)
-            headers = {
-                "Content-Type": 'text/xml; charset="utf-8"',
-                "SOAPACTION": SOAP_ACTION.format(method),
-            }
-            resp = requests.post(
-                self._soap_control_url,
-                headers=headers,
-                data=payload,
-                verify=True,
-                timeout=SOAP_TIMEOUT,
-            )
-            if resp.status_code == HTTPStatus.OK:
-                xml = resp.text
-                return xmltodict.parse(xml)["s:Envelope"]["s:Body"][
-                    SOAP_RESPONSE.format(method)
-                ]
+            payload, headers = SOAP_REQUESTS.get(method) or build_soap_request(method)
+            with self.scheduler.slot(soap_priority(method)):
+                resp = self._traced_call(
+                    TRACE_SOAP,
+                    method,
+                    REST_POST,
+                    self._session_request,
+                    self._soap_session,
+                    REST_POST,
+                    soap_control_url,
+                    headers=headers,
+                    data=payload,
+                    verify=True,
+                    timeout=SOAP_TIMEOUT,
+                )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self.circuit_breaker.record_failure()
             return None
         except requests.exceptions.RequestException:
             return None
+        self.circuit_breaker.record_success()
+        if resp.status_code == HTTPStatus.OK:
+            return parse_soap_response(resp.text, method)
+        return None
+
+    def discover_soap_control_url(self):
+        """Start discovery of the SOAP control url in the background, if needed."""
+        with self._soap_lock:
+            if self._soap_discovery:
+                return self._soap_discovery
+            if (
+                not self.ipaddress
+                or self.circuit_breaker.state == CIRCUIT_OPEN
+                or time.monotonic() < self._soap_retry_at
+            ):
+                # Not set up yet, not reachable or failed recently, so don't
+                # start a discovery that is likely to fail
+                discovery = Future()
+                discovery.set_result(None)
+                return discovery
+            self._soap_discovery = Future()
+            threading.Thread(
+                target=self._run_soap_discovery,
+                name=f"skyq-soap-{self._host}",
+                daemon=True,
+            ).start()
+            return self._soap_discovery
+
+    @property
+    def soap_control_url(self):
+        """Return the SOAP control url, if discovery has completed."""
+        discovery = self._soap_discovery
+        return discovery.result() if discovery and discovery.done() else None
+
+    def set_soap_control_url(self, soap_control_url):
+        """Use a previously discovered SOAP control url, or None to rediscover."""
+        with self._soap_lock:
+            self._soap_discovery = None
+            if soap_control_url:
+                self._soap_discovery = Future()
+                self._soap_discovery.set_result(soap_control_url)
 
     def http_json(self, path, headers=None) -> str:
         """Make an HTTP get call to the sky box."""
         _LOGGER.debug("HTTP Get Call - %s - %s", self._host, path)
-        response = requests.get(
+        response = self._traced_call(
+            TRACE_REST,
+            path,
+            REST_GET,
+            self._session_request,
+            self._rest_session,
+            REST_GET,
             REST_BASE_URL.format(self._host, self.json_port, path),
             timeout=HTTP_TIMEOUT,
             headers=headers,
@@ -134,7 +313,13 @@ class DeviceAccess:
     def http_json_post(self, path, headers=None) -> str:
         """Make an HTTP post call to the sky box."""
         _LOGGER.debug("HTTP Post Call - %s - %s", self._host, path)
-        response = requests.post(
+        response = self._traced_call(
+            TRACE_REST,
+            path,
+            REST_POST,
+            self._session_request,
+            self._rest_session,
+            REST_POST,
             REST_BASE_URL.format(self._host, self.json_port, path),
             timeout=HTTP_TIMEOUT,
             headers=headers,
@@ -144,103 +329,211 @@ class DeviceAccess:
     def http_json_delete(self, path, headers=None) -> str:
         """Make an HTTP delete call to the sky box."""
         _LOGGER.debug("HTTP Delete Call - %s - %s", self._host, path)
-        response = requests.delete(
+        response = self._traced_call(
+            TRACE_REST,
+            path,
+            REST_DELETE,
+            self._session_request,
+            self._rest_session,
+            REST_DELETE,
             REST_BASE_URL.format(self._host, self.json_port, path),
             timeout=HTTP_TIMEOUT,
             headers=headers,
         )
         return response.status_code
 
-    def send_command(self, port, code):
-        """Send a command to the sky box."""
-        _LOGGER.debug("Socket Call - %s - %s", self._host, code)
-        command_bytes = bytearray(
-            [4, 1, 0, 0, 0, 0, int(math.floor(224 + (code / 16))), code % 16]
+    def http_schedule(self, url, headers):
+        """Make an HTTP get call to the schedule service."""
+        return self._fixture_exchange(
+            REST_GET,
+            url,
+            None,
+            lambda: requests.get(url, headers=headers, timeout=EPG_TIMEOUT),
         )
 
+    def add_trace_hook(self, hook):
+        """Call the hook with a TransportTrace after every call to the box."""
+        self._trace_hooks = self._trace_hooks + [hook]
+
+    def remove_trace_hook(self, hook):
+        """Stop calling a trace hook."""
+        self._trace_hooks = [
+            trace_hook for trace_hook in self._trace_hooks if trace_hook != hook
+        ]
+
+    def _traced_call(self, transport, endpoint, method, function, *args, **kwargs):
+        """Make a call to the box, passing its trace to any hooks."""
+        if not self._trace_hooks:
+            return function(*args, **kwargs)
+
+        start = time.monotonic()
         try:
-            client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        except socket.error as err:
-            _LOGGER.exception(
-                "X0030DA - Failed to create socket when sending command: %s : %s ",
+            result = function(*args, **kwargs)
+        except Exception as err:
+            self._trace(transport, endpoint, method, type(err).__name__, None, start)
+            raise
+        if isinstance(result, requests.Response):
+            status, received = result.status_code, len(result.content)
+        elif isinstance(result, (str, bytes)):
+            status, received = TRACE_OK, len(result)
+        else:
+            status, received = TRACE_OK, None
+        self._trace(transport, endpoint, method, status, received, start)
+        return result
+
+    def _trace(self, transport, endpoint, method, status, received, start):
+        trace = TransportTrace(
+            self._host,
+            transport,
+            endpoint_template(endpoint) if transport == TRACE_REST else endpoint,
+            method.upper() if isinstance(method, str) else method,
+            status,
+            received,
+            time.monotonic() - start,
+        )
+        for hook in self._trace_hooks:
+            try:
+                hook(trace)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.exception(
+                    "X0080DA - Trace hook failed: %s : %s", self._host, err
+                )
+
+    def _fixture_exchange(self, method, url, action, send):
+        """Make a call, recording or replaying it if fixtures are in use."""
+        if not self.fixtures:
+            return send()
+        return self.fixtures.exchange(method, url, action, send)
+
+    def _session_request(self, session, method, url, **kwargs):
+        """Make a request on a pooled session, or replay it from the fixtures."""
+        return self._fixture_exchange(
+            method,
+            url,
+            (kwargs.get("headers") or {}).get("SOAPACTION"),
+            lambda: session.request(method, url, **kwargs),
+        )
+
+    def send_command(self, port, code):
+        """Send a command to the sky box."""
+        if not self.circuit_breaker.allow_request():
+            _LOGGER.debug(
+                "D0050DA - Box not reachable, command not sent: %s : %s",
                 self._host,
-                err,
+                code,
             )
             return
+        _LOGGER.debug("Socket Call - %s - %s", self._host, code)
+        if not self._remote_control or self._remote_control.port != port:
+            if self._remote_control:
+                self._remote_control.close()
+            self._remote_control = RemoteControlConnection(self._host, port)
 
         try:
-            client.connect((self._host, port))
-        except Exception as err:  # pylint: disable=broad-except
+            with self.scheduler.slot(PRIORITY_INTERACTIVE):
+                self._traced_call(
+                    TRACE_TCP,
+                    TRACE_REMOTE_ENDPOINT,
+                    code,
+                    self._fixture_exchange,
+                    TRACE_TCP,
+                    f"{self._host}:{port}",
+                    code,
+                    lambda: self._remote_control.send_command(code),
+                )
+            self.circuit_breaker.record_success()
+        except socket.timeout:
+            self.circuit_breaker.record_failure()
+            _LOGGER.error(
+                "E0010DA - Timeout error sending command: %s : %s", self._host, code
+            )
+        except OSError as err:
+            self.circuit_breaker.record_failure()
             _LOGGER.exception(
                 "X0040DA - Failed to connect to client when sending command: %s : %s",
                 self._host,
                 err,
             )
-            return
 
-        strlen = 12
-        timeout = time.time() + CONNECT_TIMEOUT
-
-        while 1:
-            data = client.recv(1024)
-
-            if len(data) < 24:
-                client.sendall(data[:strlen])
-                strlen = 1
-            else:
-                client.sendall(command_bytes)
-                command_bytes[1] = 0
-                client.sendall(command_bytes)
-                client.close()
-                break
-
-            if time.time() > timeout:
-                _LOGGER.error(
-                    "E0010DA - Timeout error sending command: %s : %s", self._host, code
-                )
-                break
+    @property
+    def remote_control_latency(self):
+        """Return the handshake and send latency of the remote control session."""
+        if not self._remote_control:
+            return None
+        return {
+            "handshake": self._remote_control.handshake_latency,
+            "send": self._remote_control.send_latency,
+        }
 
     def press(self, sequence):
         """Issue the specified sequence of commands to SkyQ box."""
-        if isinstance(sequence, list):
-            for item in sequence:
-                if item.casefold() not in COMMANDS:
-                    _LOGGER.error(
-                        "E0020DA - Invalid command: %s : %s", self._host, item
-                    )
-                    break
-                self.send_command(self.port, COMMANDS[item.casefold()])
-                time.sleep(0.5)
-        elif sequence not in COMMANDS:
-            _LOGGER.error("E0030DA - Invalid command: %s : %s", self._host, sequence)
-        else:
-            self.send_command(self.port, COMMANDS[sequence.casefold()])
+        return self.key_sequencer.press(sequence)
 
-    def _find_play_service(self, description):
-        services = description["root"]["device"]["serviceList"]["service"]
-        if not isinstance(services, list):
-            services = [services]
-        play_service = None
-        for service in services:
-            if service["serviceId"] == SKY_PLAY_URN:
-                play_service = service
+    def _current_transport_state(self):
+        """Get the transport state, if the control url is already known."""
+        if not self.soap_control_url:
+            return None
+        # Bypass any freshness window, the change is what's being waited for
+        response = self._call_sky_soap_service(UPNP_GET_TRANSPORT_INFO)
+        return response[CURRENT_TRANSPORT_STATE] if response else None
 
-        return play_service
+    def _run_soap_discovery(self):
+        discovery = self._soap_discovery
+        soap_control_url = None
+        try:
+            soap_control_url = self._get_soap_control_url()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.exception(
+                "X0070DA - Soap Control URL discovery failed: %s : %s", self._host, err
+            )
+        with self._soap_lock:
+            if soap_control_url:
+                self._soap_backoff = SOAP_DISCOVERY_BACKOFF_MIN
+            elif self._soap_discovery is discovery:
+                # e.g. the box is still booting, so discover again later
+                self._soap_discovery = None
+                self._soap_retry_at = time.monotonic() + self._soap_backoff
+                self._soap_backoff = min(
+                    self._soap_backoff * 2, SOAP_DISCOVERY_BACKOFF_MAX
+                )
+        discovery.set_result(soap_control_url)
 
     def _get_soap_control_url(self):
         """Get the soapcontrourl for the SkyQ box."""
-        url_index = 0
         soap_control_url = None
-        while soap_control_url is None and url_index < 50:
-            soap_control_url = self._get_soap_control_url_item(url_index)["url"]
-            url_index += 1
+        session = _build_session(SOAP_DISCOVERY_WORKERS)
+        executor = ThreadPoolExecutor(
+            max_workers=SOAP_DISCOVERY_WORKERS,
+            thread_name_prefix=f"skyq-soap-{self._host}",
+        )
+        found = threading.Event()
+        probes = []
+        try:
+            probes = [
+                executor.submit(
+                    self._get_soap_control_url_item, url_index, session, found
+                )
+                for url_index in range(SOAP_DESCRIPTION_COUNT)
+            ]
+            # Check in index order, so the lowest matching description wins
+            for probe in probes:
+                if soap_control_url := probe.result()["url"]:
+                    break
+        finally:
+            # Stop the probes left, and let those running finish before closing
+            # the session they use
+            found.set()
+            for probe in probes:
+                probe.cancel()
+            executor.shutdown(wait=True)
+            session.close()
 
         if not soap_control_url:
             _LOGGER.warning("W0030DA - Soap Control URL not available - %s", self._host)
 
         return soap_control_url
 
-    def _get_soap_control_url_item(self, description_index):
+    def _get_soap_control_url_item(self, description_index, session, found):
         """Get the sky control url."""
         # _LOGGER.debug("SoapControlURL - %s - %s", self.ipaddress, description_index)
         description_url = SOAP_DESCRIPTION_BASE_URL.format(
@@ -248,10 +541,20 @@ class DeviceAccess:
         )
         headers = {"User-Agent": SOAP_USER_AGENT}
         empty_return = {"url": None, "status": "Not Found"}
+        # Discovery has its own workers and session, so isn't held to the box's
+        # in-flight cap, which would slow it and hold up interactive calls
+        if found.is_set():
+            return empty_return
         try:
-            resp = requests.get(description_url, headers=headers, timeout=SOAP_TIMEOUT)
+            resp = self._session_request(
+                session,
+                REST_GET,
+                description_url,
+                headers=headers,
+                timeout=SOAP_TIMEOUT,
+            )
             if resp.status_code == HTTPStatus.OK:
-                return self._build_soap_control_url_if_present(resp, empty_return)
+                return build_soap_control_url(resp.text, self.ipaddress) or empty_return
             return empty_return
         except requests.exceptions.Timeout:
             _LOGGER.debug(
@@ -269,21 +572,123 @@ class DeviceAccess:
             )
             return empty_return
 
-    def _build_soap_control_url_if_present(self, resp, empty_return):
-        description = xmltodict.parse(resp.text)
-        device_type = description["root"]["device"]["deviceType"]
-        if SKYCONTROL not in device_type:
-            return empty_return
 
-        play_service = self._find_play_service(description)
+def build_soap_request(method):
+    """Build the payload and headers for a SOAP action."""
+    return (
+        SOAP_PAYLOAD.format(method).encode("utf-8"),
+        {
+            "Content-Type": 'text/xml; charset="utf-8"',
+            "SOAPACTION": SOAP_ACTION.format(method),
+        },
+    )
 
-        if play_service is None:
-            return empty_return
 
-        return {
-            "url": SOAP_CONTROL_BASE_URL.format(
-                self.ipaddress,
-                play_service["controlURL"],  # pylint: disable=unsubscriptable-object
-            ),
-            "status": "OK",
-        }
+SOAP_REQUESTS = {
+    method: build_soap_request(method)
+    for method in [UPNP_GET_MEDIA_INFO, UPNP_GET_TRANSPORT_INFO]
+}
+_SOAP_FIELD_PATTERNS = {
+    field: re.compile(f"<{field}(?:/>|>([^<]*)</{field}>)")
+    for fields in UPNP_RESPONSE_FIELDS.values()
+    for field in fields
+}
+
+
+def parse_soap_response(xml, method):
+    """Extract the action response from a SOAP envelope."""
+    if method in UPNP_RESPONSE_FIELDS and (
+        response := _parse_soap_fields(xml, UPNP_RESPONSE_FIELDS[method])
+    ):
+        return response
+    return xmltodict.parse(xml)["s:Envelope"]["s:Body"][SOAP_RESPONSE.format(method)]
+
+
+def _parse_soap_fields(xml, fields):
+    """Pick the plain text fields out of a response, or None to parse it fully."""
+    response = {}
+    for field in fields:
+        match = _SOAP_FIELD_PATTERNS[field].search(xml)
+        if not match:
+            # Missing or has attributes/children, leave it to xmltodict
+            return None
+        value = (match.group(1) or "").strip()
+        if "&" in value:
+            value = html.unescape(value)
+        response[field] = value or None
+    return response
+
+
+def build_soap_control_url(description_xml, ipaddress):
+    """Build the SkyPlay control url from a UPnP description, if present."""
+    description = xmltodict.parse(description_xml)
+    device_type = description["root"]["device"]["deviceType"]
+    if SKYCONTROL not in device_type:
+        return None
+
+    play_service = _find_play_service(description)
+
+    if play_service is None:
+        return None
+
+    return {
+        "url": SOAP_CONTROL_BASE_URL.format(
+            ipaddress,
+            play_service["controlURL"],  # pylint: disable=unsubscriptable-object
+        ),
+        "status": "OK",
+    }
+
+
+def _find_play_service(description):
+    services = description["root"]["device"]["serviceList"]["service"]
+    if not isinstance(services, list):
+        services = [services]
+    play_service = None
+    for service in services:
+        if service["serviceId"] == SKY_PLAY_URN:
+            play_service = service
+
+    return play_service
+
+
+class _StaleSocketRetry(Retry):
+    """Retry a GET/HEAD once when the box drops the socket, but not on a timeout."""
+
+    def increment(  # pylint: disable=too-many-arguments
+        self,
+        method=None,
+        url=None,
+        response=None,
+        error=None,
+        _pool=None,
+        _stacktrace=None,
+    ):
+        """Raise timeouts straight away, so a dead box isn't waited for twice."""
+        if isinstance(error, Urllib3TimeoutError):
+            raise error.with_traceback(_stacktrace)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+def _build_session(pool_size):
+    """Build a keep-alive session with a connection pool of the given size."""
+    session = requests.Session()
+    # A kept-alive socket may have been dropped by the box (e.g. after going to
+    # standby), so an idempotent call that fails on it is sent once more. A
+    # failed or timed out connect isn't retried, nor is a POST or DELETE that
+    # may have reached the box
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        max_retries=_StaleSocketRetry(
+            total=1,
+            connect=0,
+            read=1,
+            other=1,
+            status=0,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+        ),
+    )
+    session.mount("http://", adapter)
+    return session
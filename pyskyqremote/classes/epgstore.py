@@ -0,0 +1,130 @@
+"""Store of schedule days shared by every SkyQ remote in the process."""
+import asyncio
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from ..const import EPG_STORE_CAPACITY, EPG_STORE_DAY_END_HOURS, EPG_STORE_FETCH
+from .singleflight import SingleFlight
+from .stats import CacheStats
+
+# Keys are (schedule url, territory, sid, YYYYMMDD, channel name)
+_KEY_DATE = 3
+
+
+class EPGStore:
+    """Programmes for a channel day, fetched once and served to every remote."""
+
+    def __init__(self, capacity=EPG_STORE_CAPACITY):
+        """Initialise the store, empty."""
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._days = OrderedDict()
+        self._expired_before = None
+        self._single_flight = SingleFlight()
+        self._async_flights = {}
+        self.cache_stats = CacheStats()
+
+    def __len__(self):
+        """Return the number of channel days held."""
+        return len(self._days)
+
+    @property
+    def days(self):
+        """Return a copy of the channel days held, keyed as stored."""
+        with self._lock:
+            return dict(self._days)
+
+    def lookup(self, key):
+        """Return the programmes held for a channel day, or None."""
+        past = _past_before()
+        with self._lock:
+            if past != self._expired_before:
+                self._expire(past)
+            if key in self._days:
+                self._days.move_to_end(key)
+                self.cache_stats.hit()
+                return self._days[key]
+            self.cache_stats.miss()
+            return None
+
+    def put(self, key, programmes):
+        """Hold the programmes for a channel day, dropping the least recently used."""
+        if not programmes:
+            # Failed or past the end of the schedule, so may be filled later
+            return
+        past = _past_before()
+        with self._lock:
+            if past != self._expired_before:
+                self._expire(past)
+            self._days[key] = frozenset(programmes)
+            self._days.move_to_end(key)
+            while len(self._days) > self.capacity:
+                self._days.popitem(last=False)
+                self.cache_stats.evict()
+
+    def get_day(self, key, fetch):
+        """Return the programmes for a channel day, calling fetch() once if needed."""
+        programmes = self.lookup(key)
+        if programmes is not None:
+            return programmes
+
+        def fetch_and_put():
+            programmes = fetch()
+            self.put(key, programmes)
+            return programmes
+
+        return self._single_flight.call((EPG_STORE_FETCH, key), fetch_and_put)
+
+    async def get_day_async(self, key, fetch):
+        """Return the programmes for a channel day, awaiting fetch() once if needed."""
+        programmes = self.lookup(key)
+        if programmes is not None:
+            return programmes
+
+        async def fetch_and_put():
+            programmes = await fetch()
+            self.put(key, programmes)
+            return programmes
+
+        # Futures belong to a loop, so calls are only shared within one
+        flight_key = (asyncio.get_running_loop(), key)
+        flight = self._async_flights.get(flight_key)
+        if flight is None:
+            flight = [asyncio.ensure_future(fetch_and_put()), 0]
+            self._async_flights[flight_key] = flight
+        flight[1] += 1
+        try:
+            return await asyncio.shield(flight[0])
+        finally:
+            flight[1] -= 1
+            if flight[0].done() or not flight[1]:
+                # Finished, or every caller has been cancelled so nobody wants it
+                flight[0].cancel()
+                if self._async_flights.get(flight_key) is flight:
+                    del self._async_flights[flight_key]
+
+    def _expire(self, past):
+        """Drop the days that are over everywhere, once a day."""
+        expired = [key for key in self._days if key[_KEY_DATE] < past]
+        for key in expired:
+            del self._days[key]
+        self.cache_stats.evict(len(expired))
+        self._expired_before = past
+
+    def clear(self):
+        """Drop every channel day held."""
+        with self._lock:
+            self.cache_stats.evict(len(self._days))
+            self._days = OrderedDict()
+
+
+def _past_before():
+    """Return the first day, as YYYYMMDD, that isn't yet over in every timezone."""
+    # Key dates are in whatever timezone the caller used, so a day is only
+    # dropped once it has ended in the latest one
+    latest = datetime.now(timezone.utc) - timedelta(hours=EPG_STORE_DAY_END_HOURS)
+    return latest.strftime("%Y%m%d")
+
+
+SHARED_EPG_STORE = EPGStore()
@@ -139,7 +139,7 @@ def favourite_decoder(obj):
     """Decode favourite object from json."""
     favourite = json.loads(obj)
     if "__type__" in favourite and favourite["__type__"] == "__favourite__":
-        return favourite(**favourite["attributes"])
+        return Favourite(**favourite["attributes"])
     return favourite
 
 
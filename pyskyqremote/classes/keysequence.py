@@ -0,0 +1,103 @@
+"""Pacing of key press sequences sent to the SkyQ box."""
+import logging
+import time
+
+from ..const import (
+    COMMANDS,
+    KEY_DEFAULT_GAP,
+    KEY_FEEDBACK_POLL,
+    KEY_MIN_GAP,
+    KEY_TIMING_PROFILE,
+    KEY_TIMING_PROFILES,
+    KEY_TRANSPORT_COMMANDS,
+    KEY_UNKNOWN_DEVICE,
+)
+from .remotecontrol import Latency
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class KeySequencer:
+    """Validate key sequences and pace them by timing profile and box feedback."""
+
+    def __init__(self, host, send_command=None, transport_state=None):
+        """Initialise the sequencer with the callables used to drive the box."""
+        self._host = host
+        self._send_command = send_command
+        self._transport_state = transport_state
+        self.min_gap = KEY_MIN_GAP
+        self.device_type = None
+        self._profile_overrides = {}
+        self.stats = {}
+
+    def set_timing(self, min_gap=None, profile=None):
+        """Tune the minimum gap and override the gap for specific commands."""
+        if min_gap is not None:
+            self.min_gap = min_gap
+        if profile:
+            self._profile_overrides.update(
+                {command.casefold(): gap for command, gap in profile.items()}
+            )
+
+    def validate(self, sequence):
+        """Return the sequence as a list of commands, or None if any is invalid."""
+        commands = sequence if isinstance(sequence, list) else [sequence]
+        for command in commands:
+            if command.casefold() not in COMMANDS:
+                _LOGGER.error("E0020KS - Invalid command: %s : %s", self._host, command)
+                return None
+        return [command.casefold() for command in commands]
+
+    def gap_after(self, command):
+        """Return the gap to leave after a command before the next key."""
+        profile = KEY_TIMING_PROFILES.get(self.device_type, KEY_TIMING_PROFILE)
+        gap = self._profile_overrides.get(
+            command, profile.get(command, KEY_DEFAULT_GAP)
+        )
+        return max(gap, self.min_gap)
+
+    def record(self, command, send_time, gap_time):
+        """Record the time taken to send a command and the gap left after it."""
+        # Keyed by device type, as the timing profiles are
+        device_stats = self.stats.setdefault(self.device_type or KEY_UNKNOWN_DEVICE, {})
+        if command not in device_stats:
+            device_stats[command] = {"send": Latency(), "gap": Latency()}
+        device_stats[command]["send"].record(send_time)
+        if gap_time is not None:
+            device_stats[command]["gap"].record(gap_time)
+
+    def press(self, sequence):
+        """Send a validated sequence of commands, pacing the gaps between keys."""
+        commands = self.validate(sequence)
+        if commands is None:
+            return False
+
+        last = len(commands) - 1
+        for index, command in enumerate(commands):
+            feedback = index < last and command in KEY_TRANSPORT_COMMANDS
+            previous_state = self._transport_state() if feedback else None
+
+            start = time.monotonic()
+            self._send_command(COMMANDS[command])
+            sent = time.monotonic()
+
+            gap_time = None
+            if index < last:
+                deadline = sent + self.gap_after(command)
+                if previous_state is not None:
+                    self._wait_for_transport_change(
+                        previous_state, sent + self.min_gap, deadline
+                    )
+                else:
+                    time.sleep(max(deadline - time.monotonic(), 0))
+                gap_time = time.monotonic() - sent
+            self.record(command, sent - start, gap_time)
+
+        return True
+
+    def _wait_for_transport_change(self, previous_state, earliest, deadline):
+        time.sleep(max(earliest - time.monotonic(), 0))
+        while time.monotonic() < deadline:
+            if self._transport_state() != previous_state:
+                return
+            time.sleep(min(KEY_FEEDBACK_POLL, max(deadline - time.monotonic(), 0)))
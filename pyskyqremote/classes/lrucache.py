@@ -0,0 +1,67 @@
+"""Least recently used cache, with optional expiry and size limit."""
+import time
+from collections import OrderedDict
+
+from .stats import approximate_size
+
+
+class LRUCache:
+    """Entries dropped least recently used first, beyond a count or size in bytes."""
+
+    def __init__(self, capacity, ttl=None, max_bytes=None, cache_stats=None):
+        """Initialise the cache, empty."""
+        self.capacity = capacity
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._cache_stats = cache_stats
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        """Return the number of entries held."""
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """Return the entry for a key as the most recently used, or default."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        if self._expired(entry):
+            self._drop(key)
+            return default
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value):
+        """Hold the entry for a key as the most recently used, dropping the least."""
+        if key in self._entries:
+            self.bytes -= self._entries[key][2]
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        # Measured once per entry, and only with a size limit, as it walks
+        # everything held by the value
+        size = approximate_size(value) if self.max_bytes is not None else 0
+        self._entries[key] = (value, expires, size)
+        self._entries.move_to_end(key)
+        self.bytes += size
+        while self._entries and (
+            len(self._entries) > self.capacity
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            self._drop(next(iter(self._entries)))
+
+    def items(self):
+        """Return a copy of the entries held, least recently used first."""
+        return {
+            key: entry[0]
+            for key, entry in self._entries.items()
+            if not self._expired(entry)
+        }
+
+    def _expired(self, entry):
+        return entry[1] is not None and entry[1] <= time.monotonic()
+
+    def _drop(self, key):
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+        if self._cache_stats:
+            self._cache_stats.evict()
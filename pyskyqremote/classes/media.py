@@ -21,14 +21,17 @@ class MediaInformation:
 
     def get_current_media(self):
         """Get the currently playing media on the SkyQ box."""
-        channel = None
-        channelno = None
-        image_url = None
-        sid = None
-        pvrid = None
-        live = False
-
         response = self._device_access.call_sky_soap_service(UPNP_GET_MEDIA_INFO)
+        media_source = self.parse_media_response(response)
+        if media_source is None:
+            return None
+
+        sid, pvrid, live = media_source
+        channel_node = self._get_channel_node(sid) if live else None
+        return self.build_media(sid, pvrid, live, channel_node)
+
+    def parse_media_response(self, response):
+        """Extract the sid, pvrid and live flag from a GetMediaInfo response."""
         if response is None:
             return None
 
@@ -36,23 +39,34 @@ class MediaInformation:
         if current_uri is None:
             return None
 
+        sid = None
+        pvrid = None
+        live = False
         if XSI in current_uri:
             sid = self._test_channel or int(current_uri[6:], 16)
             live = True
-            if channel_node := self._get_channel_node(sid):
-                channel = channel_node["channel"]
-                channelno = channel_node["channelno"]
-                image_url = build_channel_image_url(
-                    sid,
-                    channel,
-                    self._remote_config.url_prefix,
-                    self._remote_config.territory,
-                )
         elif PVR in current_uri:
             # Recorded content
             pvrid = f"P{current_uri[11:]}"
             live = False
 
+        return sid, pvrid, live
+
+    def build_media(self, sid, pvrid, live, channel_node):
+        """Build the media information for the playing sid or recording."""
+        channel = None
+        channelno = None
+        image_url = None
+        if channel_node:
+            channel = channel_node["channel"]
+            channelno = channel_node["channelno"]
+            image_url = build_channel_image_url(
+                sid,
+                channel,
+                self._remote_config.url_prefix,
+                self._remote_config.territory,
+            )
+
         return Media(channel, channelno, image_url, sid, pvrid, live)
 
     def _get_channel_node(self, sid):
@@ -46,10 +46,14 @@ class RecordingsInformation:
 
     def get_recordings(self, status, limit, offset):
         """Get the list of available Recordings."""
-        recordings = set()
         resp = self._remote_config.device_access.retrieve_information(
             REST_RECORDINGS_LIST.format(limit, offset)
         )
+        return self.build_recordings(resp, status)
+
+    def build_recordings(self, resp, status):
+        """Build the recordings from a recordings list response."""
+        recordings = set()
         if not resp or "pvrItems" not in resp:
             return None
         rec_data = resp["pvrItems"]
@@ -306,7 +310,7 @@ def _json_decoder_hook(obj):
         obj["starttime"] = datetime.strptime(obj["starttime"], CONST_DATE_FORMAT)
     if "endtime" in obj:
         obj["endtime"] = datetime.strptime(obj["endtime"], CONST_DATE_FORMAT)
-    if "deletetime" in obj:
+    if obj.get("deletetime"):
         obj["deletetime"] = datetime.strptime(obj["deletetime"], CONST_DATE_FORMAT)
     if "__type__" in obj and obj["__type__"] == "__recording__":
         obj = Recording(**obj["attributes"])
@@ -419,7 +423,11 @@ class Recording:
 def recordingdecoder(obj):
     """Decode recording object from json."""
     recording = json.loads(obj, object_hook=_json_decoder_hook)
-    if "__type__" in recording and recording["__type__"] == "__recording__":
+    if (
+        isinstance(recording, dict)
+        and "__type__" in recording
+        and recording["__type__"] == "__recording__"
+    ):
         return Recording(**recording["attributes"])
     return recording
 
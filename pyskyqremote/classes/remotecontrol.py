@@ -0,0 +1,138 @@
+"""Remote control connection to the SkyQ box."""
+import logging
+import math
+import select
+import socket
+import threading
+import time
+from dataclasses import dataclass
+
+from ..const import COMMANDS, REMOTE_IDLE_TIMEOUT, REMOTE_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def build_command_frames(code):
+    """Build the key down and key up frames for a command code."""
+    command_bytes = bytearray(
+        [4, 1, 0, 0, 0, 0, int(math.floor(224 + (code / 16))), code % 16]
+    )
+    key_down = bytes(command_bytes)
+    command_bytes[1] = 0
+    return key_down, bytes(command_bytes)
+
+
+COMMAND_FRAMES = {code: build_command_frames(code) for code in COMMANDS.values()}
+
+
+class RemoteControlConnection:
+    """Remote control session, handshaken once and re-used for key presses."""
+
+    def __init__(
+        self, host, port, timeout=REMOTE_TIMEOUT, idle_timeout=REMOTE_IDLE_TIMEOUT
+    ):
+        """Initialise the connection, it is opened on the first command."""
+        self._host = host
+        self.port = port
+        self._timeout = timeout
+        self._idle_timeout = idle_timeout
+        self._client = None
+        self._idle_deadline = 0
+        self._lock = threading.RLock()
+        self.handshake_latency = Latency()
+        self.send_latency = Latency()
+
+    def send_command(self, code):
+        """Send the key down/up frames for a command code to the box."""
+        frames = COMMAND_FRAMES.get(code) or build_command_frames(code)
+        with self._lock:
+            if self._client and time.monotonic() >= self._idle_deadline:
+                # Idle too long, so start a fresh session rather than trust it
+                self.close()
+            reused = self._client_alive()
+            try:
+                self._send_frames(frames)
+            except OSError:
+                self.close()
+                if not reused:
+                    raise
+                # The box dropped the kept session, so handshake again
+                _LOGGER.debug(
+                    "D0010RC - Remote control session dropped: %s", self._host
+                )
+                self._send_frames(frames)
+            self._idle_deadline = time.monotonic() + self._idle_timeout
+
+    def close(self):
+        """Close the session to the box."""
+        with self._lock:
+            if self._client:
+                self._client.close()
+                self._client = None
+
+    def _send_frames(self, frames):
+        if not self._client:
+            self._client = self._handshake()
+        start = time.monotonic()
+        for frame in frames:
+            self._client.sendall(frame)
+        self.send_latency.record(time.monotonic() - start)
+
+    def _handshake(self):
+        start = time.monotonic()
+        deadline = start + self._timeout
+        client = socket.create_connection((self._host, self.port), self._timeout)
+        try:
+            strlen = 12
+            while True:
+                client.settimeout(max(deadline - time.monotonic(), 0.001))
+                data = client.recv(1024)
+                if not data:
+                    raise ConnectionResetError("Connection closed during handshake")
+                if len(data) >= 24:
+                    break
+                client.sendall(data[:strlen])
+                strlen = 1
+        except OSError:
+            client.close()
+            raise
+        client.settimeout(self._timeout)
+        self.handshake_latency.record(time.monotonic() - start)
+        return client
+
+    def _client_alive(self):
+        """Check the kept session has not been closed by the box."""
+        if not self._client:
+            return False
+        try:
+            readable, _, _ = select.select([self._client], [], [], 0)
+            # Anything the box sent since the last command is not needed
+            if readable and not self._client.recv(1024):
+                self.close()
+                return False
+        except OSError:
+            self.close()
+            return False
+        return True
+
+
+@dataclass
+class Latency:
+    """Running latency statistics, in seconds."""
+
+    count: int = 0
+    total: float = 0.0
+    last: float = None
+    maximum: float = 0.0
+
+    @property
+    def mean(self):
+        """Return the mean latency."""
+        return self.total / self.count if self.count else None
+
+    def record(self, elapsed):
+        """Record a latency sample."""
+        self.count += 1
+        self.total += elapsed
+        self.last = elapsed
+        self.maximum = max(self.maximum, elapsed)
@@ -0,0 +1,89 @@
+"""Scheduling of concurrent requests to the SkyQ box."""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from ..const import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_NAMES,
+    PRIORITY_NORMAL,
+    SCHEDULER_BULK_PATHS,
+    SCHEDULER_INTERACTIVE_METHODS,
+)
+from .remotecontrol import Latency
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RequestScheduler:
+    """Limit the requests in flight to a box, letting interactive calls go first."""
+
+    def __init__(self, host, max_in_flight):
+        """Initialise the scheduler with no requests in flight."""
+        self._host = host
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._condition = threading.Condition()
+        self._queue = []
+        self._tickets = itertools.count()
+        self.wait_time = {name: Latency() for name in PRIORITY_NAMES}
+
+    @property
+    def queue_depth(self):
+        """Return the number of requests waiting for a slot."""
+        return len(self._queue)
+
+    @contextmanager
+    def slot(self, priority=PRIORITY_NORMAL):
+        """Wait for a free slot, in priority then arrival order."""
+        queued = time.monotonic()
+        ticket = (priority, next(self._tickets))
+        with self._condition:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while self._queue[0] != ticket or (
+                    self.max_in_flight and self.in_flight >= self.max_in_flight
+                ):
+                    self._condition.wait()
+            except BaseException:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._condition.notify_all()
+                raise
+            heapq.heappop(self._queue)
+            self.in_flight += 1
+            waited = time.monotonic() - queued
+            self.wait_time[PRIORITY_NAMES[priority]].record(waited)
+            # The next in the queue may also fit in a free slot
+            self._condition.notify_all()
+        if self._queue:
+            _LOGGER.debug(
+                "D0010SC - Requests queued: %s : %s waiting, waited %ss",
+                self._host,
+                len(self._queue),
+                round(waited, 3),
+            )
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+
+def rest_priority(rest_path):
+    """Return the priority of a REST call from its path."""
+    if rest_path.startswith(SCHEDULER_BULK_PATHS):
+        return PRIORITY_BULK
+    return PRIORITY_NORMAL
+
+
+def soap_priority(method):
+    """Return the priority of a SOAP call from its method."""
+    if method in SCHEDULER_INTERACTIVE_METHODS:
+        return PRIORITY_INTERACTIVE
+    return PRIORITY_NORMAL
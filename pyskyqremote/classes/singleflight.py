@@ -0,0 +1,59 @@
+"""Coalescing of identical concurrent calls to the SkyQ box."""
+import threading
+import time
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Share one in-flight call, and optionally its fresh result, between callers."""
+
+    def __init__(self):
+        """Initialise with no calls in flight and no freshness windows."""
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._results = {}
+        self.freshness = {}
+
+    def set_freshness(self, endpoint, seconds):
+        """Serve repeat calls to an endpoint from the last result for some seconds."""
+        with self._lock:
+            if seconds:
+                self.freshness[endpoint] = seconds
+            else:
+                self.freshness.pop(endpoint, None)
+            self._results = {
+                key: result
+                for key, result in self._results.items()
+                if key[1] in self.freshness
+            }
+
+    def call(self, key, function):
+        """Call the function, unless an identical call is in flight or fresh."""
+        endpoint = key[1]
+        with self._lock:
+            if endpoint in self.freshness and key in self._results:
+                received, result = self._results[key]
+                if time.monotonic() - received < self.freshness[endpoint]:
+                    return result
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = Future()
+
+        if not leader:
+            return flight.result()
+
+        try:
+            result = function()
+        except BaseException as err:
+            with self._lock:
+                del self._in_flight[key]
+            flight.set_exception(err)
+            raise
+
+        with self._lock:
+            del self._in_flight[key]
+            if endpoint in self.freshness:
+                self._results[key] = (time.monotonic(), result)
+        flight.set_result(result)
+        return result
@@ -0,0 +1,73 @@
+"""Persistent warm-start snapshot of a SkyQ box."""
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone
+
+from ..const import SNAPSHOT_FILE, SNAPSHOT_VERSION
+from .device import Device
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RemoteSnapshot:
+    """Save and load the state of a SkyQ box, one file per host."""
+
+    def __init__(self, snapshot_dir, host):
+        """Initialise the snapshot store for the host."""
+        self._snapshot_dir = snapshot_dir
+        self._host = host
+        name = "".join(c if c.isalnum() else "_" for c in host)
+        self._filename = os.path.join(snapshot_dir, SNAPSHOT_FILE.format(name))
+
+    def load(self):
+        """Load the snapshot saved for this host."""
+        snapshot = self._read(self._filename)
+        if (
+            not snapshot
+            or snapshot.get("version") != SNAPSHOT_VERSION
+            # Hosts differing only in punctuation share a file name
+            or snapshot.get("host") != self._host
+        ):
+            return None
+
+        try:
+            snapshot["device"] = Device(**snapshot["device"])
+        except TypeError as err:
+            _LOGGER.warning(
+                "W0010SS - Snapshot device not usable: %s : %s", self._host, err
+            )
+            return None
+        return snapshot
+
+    def save(self, device, channels, app_titles, soap_control_url):
+        """Save the snapshot for the box."""
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "host": self._host,
+            "saved": datetime.now(timezone.utc).timestamp(),
+            "device": dict(vars(device)),
+            "channels": channels,
+            "app_titles": app_titles,
+            "soap_control_url": soap_control_url,
+        }
+        filename = self._filename
+        try:
+            os.makedirs(self._snapshot_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self._snapshot_dir, suffix=".tmp", delete=False
+            ) as snapshot_file:
+                json.dump(snapshot, snapshot_file)
+            os.replace(snapshot_file.name, filename)
+        except OSError as err:
+            _LOGGER.warning(
+                "W0020SS - Snapshot not saved: %s : %s : %s", self._host, filename, err
+            )
+
+    def _read(self, filename):
+        try:
+            with open(filename, encoding="utf-8") as snapshot_file:
+                return json.load(snapshot_file)
+        except (OSError, ValueError):
+            return None
@@ -0,0 +1,45 @@
+"""Statistics on the caches kept for the SkyQ box."""
+import sys
+from dataclasses import dataclass
+
+
+@dataclass
+class CacheStats:
+    """Hit, miss and eviction counters for a cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    def hit(self):
+        """Record a lookup served from the cache."""
+        self.hits += 1
+
+    def miss(self):
+        """Record a lookup that had to go to the box or schedule service."""
+        self.misses += 1
+
+    def evict(self, count=1):
+        """Record entries dropped from the cache."""
+        self.evictions += count
+
+
+def approximate_size(obj):
+    """Return the approximate memory in bytes used by an object and its contents."""
+    size = 0
+    seen = set()
+    pending = [obj]
+    while pending:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            pending.extend(item)
+        elif hasattr(item, "__dict__"):
+            pending.append(vars(item))
+    return size
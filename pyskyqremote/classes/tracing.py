@@ -0,0 +1,136 @@
+"""Tracing of the calls made to the SkyQ box."""
+import bisect
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from http import HTTPStatus
+
+from ..const import REST_TEMPLATES, TRACE_BUCKETS, TRACE_OK
+
+_REST_PATTERNS = [
+    (
+        re.compile(re.sub(r"\\\{\d\\\}", "[^/&]*", re.escape(template))),
+        template,
+    )
+    for template in REST_TEMPLATES
+]
+
+
+@lru_cache(maxsize=256)
+def endpoint_template(rest_path):
+    """Return the template a REST path was built from, e.g. pvr/details/{0}."""
+    for pattern, template in _REST_PATTERNS:
+        if pattern.fullmatch(rest_path):
+            return template
+    return rest_path
+
+
+@dataclass
+class TransportTrace:
+    """A call made to the SkyQ box."""
+
+    host: str = field(
+        init=True,
+        repr=True,
+        compare=False,
+    )
+    transport: str = field(
+        init=True,
+        repr=True,
+        compare=False,
+    )
+    endpoint: str = field(
+        init=True,
+        repr=True,
+        compare=False,
+    )
+    method: str = field(
+        init=True,
+        repr=True,
+        compare=False,
+    )
+    status: object = field(
+        init=True,
+        repr=True,
+        compare=False,
+    )
+    received: int = field(
+        init=True,
+        repr=True,
+        compare=False,
+    )
+    elapsed: float = field(
+        init=True,
+        repr=True,
+        compare=False,
+    )
+
+    @property
+    def ok(self):  # pylint: disable=invalid-name
+        """Return whether the call succeeded."""
+        if isinstance(self.status, int):
+            return HTTPStatus.OK <= self.status < HTTPStatus.MULTIPLE_CHOICES
+        return self.status == TRACE_OK
+
+
+@dataclass
+class EndpointHistogram:
+    """Latency histogram and error count for one endpoint."""
+
+    buckets: list = field(default_factory=lambda: [0] * (len(TRACE_BUCKETS) + 1))
+    count: int = 0
+    errors: int = 0
+    total: float = 0
+    received: int = 0
+
+    def record(self, trace):
+        """Record a call to the endpoint."""
+        self.buckets[bisect.bisect_left(TRACE_BUCKETS, trace.elapsed)] += 1
+        self.count += 1
+        self.total += trace.elapsed
+        self.received += trace.received or 0
+        if not trace.ok:
+            self.errors += 1
+
+
+class TraceCollector:
+    """Trace hook keeping a latency histogram per transport and endpoint."""
+
+    bucket_bounds = TRACE_BUCKETS
+
+    def __init__(self):
+        """Initialise the collector, empty."""
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.last_success = None
+
+    def __call__(self, trace):
+        """Record a traced call."""
+        key = (trace.host, trace.transport, trace.endpoint)
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = EndpointHistogram()
+            self.histograms[key].record(trace)
+            if trace.ok:
+                self.last_success = time.monotonic()
+
+    def snapshot(self):
+        """Return a copy of the histograms, for export."""
+        with self._lock:
+            return {
+                key: EndpointHistogram(
+                    list(histogram.buckets),
+                    histogram.count,
+                    histogram.errors,
+                    histogram.total,
+                    histogram.received,
+                )
+                for key, histogram in self.histograms.items()
+            }
+
+    def reset(self):
+        """Clear the histograms."""
+        with self._lock:
+            self.histograms = {}
@@ -0,0 +1,152 @@
+"""Record and replay of the calls made to the SkyQ box, for repeatable tests."""
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+
+from ..const import FIXTURE_FILE, FIXTURE_RECORD, FIXTURE_REPLAY
+
+_LOGGER = logging.getLogger(__name__)
+
+_REPLAY_ERRORS = {
+    error.__name__: error
+    for error in [
+        requests.exceptions.ConnectTimeout,
+        requests.exceptions.ReadTimeout,
+        requests.exceptions.Timeout,
+        requests.exceptions.ConnectionError,
+        TimeoutError,
+    ]
+}
+
+
+class TransportFixtures:
+    """Record every call to a box to a fixture file, or replay calls from it."""
+
+    def __init__(self, fixture_dir, host, mode, replay_timing=1):
+        """Initialise the fixtures, loading the recorded calls when replaying."""
+        if mode not in (FIXTURE_RECORD, FIXTURE_REPLAY):
+            raise ValueError(f"Unknown fixture mode: {mode}")
+        self._host = host
+        self.mode = mode
+        self.replay_timing = replay_timing
+        safe_host = "".join(c if c.isalnum() else "_" for c in host)
+        self.filename = os.path.join(fixture_dir, FIXTURE_FILE.format(safe_host))
+        self._lock = threading.Lock()
+        self._exchanges = {}
+        self._positions = {}
+        self.misses = 0
+        if mode == FIXTURE_RECORD:
+            os.makedirs(fixture_dir, exist_ok=True)
+        else:
+            self._load()
+
+    @property
+    def replaying(self):
+        """Return whether calls are served from the fixtures."""
+        return self.mode == FIXTURE_REPLAY
+
+    def exchange(self, method, url, action, send):
+        """Make the call with send(), or replay it, keyed by method, url and action."""
+        if self.replaying:
+            return self._replay(method, url, action)
+
+        start = time.monotonic()
+        try:
+            response = send()
+        except (requests.exceptions.RequestException, OSError) as err:
+            self._record(method, url, action, {"error": type(err).__name__}, start)
+            raise
+        if isinstance(response, requests.Response):
+            recorded = {
+                "status": response.status_code,
+                "encoding": response.encoding,
+                "body": response.text,
+            }
+        else:
+            recorded = {"body": response}
+        self._record(method, url, action, recorded, start)
+        return response
+
+    def _record(self, method, url, action, recorded, start):
+        recorded.update(
+            {
+                "method": method,
+                "url": url,
+                "action": action,
+                "elapsed": time.monotonic() - start,
+            }
+        )
+        line = json.dumps(recorded) + "\n"
+        with self._lock:
+            try:
+                with open(self.filename, "a", encoding="utf-8") as fixture_file:
+                    fixture_file.write(line)
+            except OSError as err:
+                _LOGGER.warning(
+                    "W0010TF - Fixture not recorded: %s : %s : %s",
+                    self._host,
+                    self.filename,
+                    err,
+                )
+
+    def _replay(self, method, url, action):
+        key = (method, url, action)
+        with self._lock:
+            exchanges = self._exchanges.get(key)
+            if not exchanges:
+                recorded = None
+                self.misses += 1
+            else:
+                # Cycle through the calls recorded, e.g. a changing poll result
+                position = self._positions.get(key, 0)
+                recorded = exchanges[position % len(exchanges)]
+                self._positions[key] = position + 1
+
+        if not recorded:
+            # e.g. a discovery probe cancelled while recording, so not an error
+            _LOGGER.debug(
+                "D0010TF - No fixture recorded: %s : %s %s %s",
+                self._host,
+                method,
+                url,
+                action or "",
+            )
+            raise requests.exceptions.ConnectTimeout(f"No fixture for {method} {url}")
+
+        if self.replay_timing:
+            time.sleep(recorded["elapsed"] * self.replay_timing)
+        if "error" in recorded:
+            error = _REPLAY_ERRORS.get(
+                recorded["error"], requests.exceptions.ConnectionError
+            )
+            raise error(f"Replayed {recorded['error']} for {method} {url}")
+        if "status" not in recorded:
+            return recorded["body"]
+
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response.encoding = recorded["encoding"] or "utf-8"
+        response._content = (  # pylint: disable=protected-access
+            recorded["body"].encode(response.encoding)
+        )
+        response.url = url
+        return response
+
+    def _load(self):
+        try:
+            with open(self.filename, encoding="utf-8") as fixture_file:
+                for line in fixture_file:
+                    recorded = json.loads(line)
+                    key = (recorded["method"], recorded["url"], recorded["action"])
+                    self._exchanges.setdefault(key, []).append(recorded)
+        except (OSError, ValueError, KeyError) as err:
+            _LOGGER.warning(
+                "W0020TF - Fixtures not loaded: %s : %s : %s",
+                self._host,
+                self.filename,
+                err,
+            )
@@ -0,0 +1,111 @@
+"""Long-lived websocket subscription to the SkyQ box."""
+import json
+import logging
+import threading
+
+import websocket
+
+from ..const import (
+    HTTP_TIMEOUT,
+    WS_BASE_URL,
+    WS_PING_INTERVAL,
+    WS_RECONNECT_MAX,
+    WS_RECONNECT_MIN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WebSocketSubscription:
+    """Keep a websocket open and pass each message pushed by the box on."""
+
+    def __init__(self, host, method, on_message):
+        """Initialise the subscription, call start() to connect."""
+        self._host = host
+        self._method = method
+        self._url = WS_BASE_URL.format(host, method)
+        self._on_message = on_message
+        self._stop = threading.Event()
+        self._websock = None
+        self._thread = None
+        self.connected = False
+
+    @property
+    def running(self):
+        """Return whether the background reader is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the background reader."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"skyq-ws-{self._host}-{self._method}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background reader and close the websocket."""
+        self._stop.set()
+        if websock := self._websock:
+            websock.shutdown()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(HTTP_TIMEOUT)
+        self._thread = None
+
+    def _run(self):
+        backoff = WS_RECONNECT_MIN
+        while not self._stop.is_set():
+            try:
+                self._websock = websocket.create_connection(
+                    self._url, timeout=HTTP_TIMEOUT
+                )
+                self._websock.settimeout(WS_PING_INTERVAL)
+                self.connected = True
+                backoff = WS_RECONNECT_MIN
+                _LOGGER.debug("WS Subscribed - %s - %s", self._host, self._method)
+                self._read_messages()
+            except Exception as err:  # pylint: disable=broad-except
+                if not self._stop.is_set():
+                    _LOGGER.debug(
+                        "D0010WS - Websocket subscription dropped, "
+                        "retry in %ss: %s : %s",
+                        backoff,
+                        self._host,
+                        err,
+                    )
+            finally:
+                self.connected = False
+                if websock := self._websock:
+                    self._websock = None
+                    websock.shutdown()
+
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, WS_RECONNECT_MAX)
+
+    def _read_messages(self):
+        while not self._stop.is_set():
+            try:
+                message = self._websock.recv()
+            except websocket.WebSocketTimeoutException:
+                # Nothing pushed for a while, check the box is still there
+                self._websock.ping()
+                continue
+
+            try:
+                payload = json.loads(message)
+            except ValueError:
+                continue
+
+            try:
+                self._on_message(payload)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.exception(
+                    "X0010WS - Error handling websocket message: %s : %s : %s",
+                    self._host,
+                    self._method,
+                    err,
+                )
@@ -6,6 +6,10 @@ SKYCONTROL = "SkyControl"
 SOAP_ACTION = '"urn:schemas-nds-com:service:SkyPlay:2#{0}"'
 SOAP_CONTROL_BASE_URL = "http://{0}:49153{1}"
 SOAP_DESCRIPTION_BASE_URL = "http://{0}:49153/description{1}.xml"
+SOAP_DESCRIPTION_COUNT = 50
+SOAP_DISCOVERY_WORKERS = 8
+SOAP_DISCOVERY_BACKOFF_MIN = 10
+SOAP_DISCOVERY_BACKOFF_MAX = 300
 SOAP_PAYLOAD = """<s:Envelope xmlns:s='http://schemas.xmlsoap.org/soap/envelope/' s:encodingStyle='http://schemas.xmlsoap.org/soap/encoding/'>  # pylint: disable=line-too-long
     <s:Body>
         <u:{0} xmlns:u="urn:schemas-nds-com:service:SkyPlay:2">
@@ -15,12 +19,17 @@ SOAP_PAYLOAD = """<s:Envelope xmlns:s='http://schemas.xmlsoap.org/soap/envelope/
 </s:Envelope>"""
 SOAP_RESPONSE = "u:{0}Response"
 SOAP_USER_AGENT = "SKYPLUS_skyplus"
+SOAP_CALL = "soap"
 UPNP_GET_MEDIA_INFO = "GetMediaInfo"
 UPNP_GET_TRANSPORT_INFO = "GetTransportInfo"
 
 # WebSocket Constants
 WS_BASE_URL = "ws://{0}:9006/as/{1}"
 WS_CURRENT_APPS = "apps/status"
+WS_CALL = "ws"
+WS_PING_INTERVAL = 30
+WS_RECONNECT_MIN = 1
+WS_RECONNECT_MAX = 60
 
 # REST Constants
 REST_BASE_URL = "http://{0}:{1}/as/{2}"
@@ -49,6 +58,24 @@ REST_SYSTEM_TIME = "system/time"
 REST_PATH_SYSTEMINFO = "system/information"
 REST_PATH_DEVICEINFO = "system/deviceinformation"
 REST_PATH_APPS = "apps"
+REST_TEMPLATES = [
+    REST_CHANNEL_LIST,
+    REST_BOOK_RECORDING,
+    REST_BOOK_PPVRECORDING,
+    REST_BOOK_SERIES_RECORDING,
+    REST_RECORDING_DETAILS,
+    REST_RECORDINGS_LIST,
+    REST_RECORDING_KEEP,
+    REST_RECORDING_UNKEEP,
+    REST_RECORDING_LOCK,
+    REST_RECORDING_UNLOCK,
+    REST_RECORDING_DELETE,
+    REST_RECORDING_UNDELETE,
+    REST_RECORDING_ERASE,
+    REST_RECORDING_SET_LAST_PLAYED_POSITION,
+    REST_SERIES_LINK,
+    REST_SERIES_UNLINK,
+]
 REST_GET = "get"
 REST_POST = "post"
 REST_DELETE = "delete"
@@ -58,6 +85,14 @@ CURRENT_URI = "CurrentURI"
 CURRENT_TRANSPORT_STATE = "CurrentTransportState"
 CURRENT_TRANSPORT_STATUS = "CurrentTransportStatus"
 CURRENT_SPEED = "CurrentSpeed"
+UPNP_RESPONSE_FIELDS = {
+    UPNP_GET_MEDIA_INFO: [CURRENT_URI],
+    UPNP_GET_TRANSPORT_INFO: [
+        CURRENT_TRANSPORT_STATE,
+        CURRENT_TRANSPORT_STATUS,
+        CURRENT_SPEED,
+    ],
+}
 DEFAULT_TRANSPORT_STATE = "OK"
 DEFAULT_TRANSPORT_SPEED = 1
 APP_STATUS_VISIBLE = "VISIBLE"
@@ -134,12 +169,32 @@ URL_PREFIX = {"DEU": "de.", "GBR": "", "ITA": "it."}
 # Random set of other constants
 EPG_ERROR_PAST_END = "past end of epg"
 EPG_ERROR_NO_DATA = "no epg data found"
+EPG_ERROR_NO_CHANNEL = "channel not found"
+EPG_ERROR_INCOMPLETE = "epg incomplete"
 
 RESPONSE_OK = 200
-CONNECT_TIMEOUT = 1000
 EPG_TIMEOUT = 60
 HTTP_TIMEOUT = 6
 SOAP_TIMEOUT = 2
+REMOTE_TIMEOUT = 2
+REMOTE_IDLE_TIMEOUT = 5
+CONNECT_TIMEOUT = REMOTE_TIMEOUT  # Kept for code importing the old name
+REST_POOL_SIZE = 4
+SOAP_POOL_SIZE = 2
+TRACE_REST = "rest"
+TRACE_SOAP = "soap"
+TRACE_WS = "ws"
+TRACE_TCP = "tcp"
+TRACE_REMOTE_ENDPOINT = "remote"
+TRACE_OK = "OK"
+TRACE_BUCKETS = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+SCHEDULER_MAX_IN_FLIGHT = 2
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+PRIORITY_NAMES = ["interactive", "normal", "bulk"]
+SCHEDULER_BULK_PATHS = ("pvr/?", "services/", REST_PATH_APPS)
+SCHEDULER_INTERACTIVE_METHODS = [UPNP_GET_TRANSPORT_INFO]
 
 AUDIO = "audio"
 VIDEO = "video"
@@ -156,6 +211,87 @@ DEVICE_MULTIROOMSTB = "MULTIROOMSTB"
 DEVICE_TV = "TV"
 UNSUPPORTED_DEVICES = [DEVICE_IPSETTOPBOX, DEVICE_TV]
 
+# Key press pacing, gaps in seconds after each key before the next is sent
+KEY_MIN_GAP = 0.1
+KEY_DEFAULT_GAP = 0.25
+KEY_FEEDBACK_POLL = 0.1
+KEY_UNKNOWN_DEVICE = "unknown"
+KEY_TRANSPORT_COMMANDS = ["play", "pause", "stop", "fastforward", "rewind"]
+KEY_TIMING_PROFILE = {
+    "0": 0.15,
+    "1": 0.15,
+    "2": 0.15,
+    "3": 0.15,
+    "4": 0.15,
+    "5": 0.15,
+    "6": 0.15,
+    "7": 0.15,
+    "8": 0.15,
+    "9": 0.15,
+    "power": 1.0,
+    "home": 0.5,
+    "tvguide": 0.5,
+    "services": 0.5,
+    "search": 0.5,
+    "sky": 0.5,
+    "boxoffice": 0.5,
+    "play": 1.0,
+    "pause": 1.0,
+    "stop": 1.0,
+    "fastforward": 1.0,
+    "rewind": 1.0,
+}
+KEY_TIMING_PROFILES = {
+    DEVICE_GATEWAYSTB: KEY_TIMING_PROFILE,
+    DEVICE_MULTIROOMSTB: {
+        **KEY_TIMING_PROFILE,
+        **{str(digit): 0.2 for digit in range(10)},
+    },
+}
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half open"
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_BACKOFF_MIN = 5
+CIRCUIT_BACKOFF_MAX = 300
+
+CACHE_APPS = "apps"
+CACHE_CHANNELS = "channels"
+CACHE_EPG = "epg"
+CACHE_PROGRAMME = "programme"
+CACHE_RECORDING = "recording"
+CACHE_NAMES = [CACHE_APPS, CACHE_CHANNELS, CACHE_EPG, CACHE_PROGRAMME, CACHE_RECORDING]
+CACHE_EPG_STORE = "epg_store"
+
+EPG_STORE_CAPACITY = 2000
+EPG_STORE_FETCH = "EPG"
+# Hours after UTC midnight that a day ends in the latest timezone (UTC-12)
+EPG_STORE_DAY_END_HOURS = 12
+EPG_FETCH_WORKERS = 4
+EPG_BULK_WORKERS = 8
+EPG_BATCH_SIZE = 10
+
+CHANNEL_LINEUP_TTL = 6 * 60 * 60
+CHANNEL_LINEUP_MISS_REFRESH = 60
+CHANNEL_LINEUP_FETCH = "LINEUP"
+
+SETUP_PENDING = "pending"
+SETUP_IN_PROGRESS = "in progress"
+SETUP_COMPLETE = "complete"
+SETUP_FAILED = "failed"
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FILE = "skyq_{0}.json"
+SNAPSHOT_REVALIDATE_JITTER = 30
+
+FIXTURE_RECORD = "record"
+FIXTURE_REPLAY = "replay"
+FIXTURE_FILE = "skyq_transport_{0}.jsonl"
+
+FLEET_POLL_INTERVAL = 30
+FLEET_MAX_WORKERS = 8
+
 SCHEDULE_URL = "http://atlantis.epgsky.com/as/schedule/{1}/{0}"
 LIVE_IMAGE_URL = (
     "https://{1}imageservice.sky.com/pd-image/{0}/16-9/1024?territory={2}"
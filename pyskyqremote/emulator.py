@@ -0,0 +1,579 @@
+"""Emulator of a SkyQ box, for testing and benchmarking without a box."""
+
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import random
+import select
+import socketserver
+import struct
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Empty, Queue
+from urllib.parse import parse_qs, urlsplit
+
+from .const import (
+    COMMANDS,
+    SKY_STATE_PAUSED,
+    SKY_STATE_PLAYING,
+    SKY_STATE_STOPPED,
+    SOAP_RESPONSE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+EMULATOR_SOAP_PORT = 49153
+EMULATOR_CONTROL_URL = "/SkyPlay2"
+EMULATOR_DESCRIPTIONS = 10
+EMULATOR_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+EMULATOR_EPG_APP = "com.bskyb.epgui"
+EMULATOR_DESCRIPTION = """<?xml version="1.0"?>
+<root xmlns="urn:schemas-upnp-org:device-1-0">
+  <device>
+    <deviceType>urn:schemas-nds-com:device:{0}:2</deviceType>
+    <serviceList>
+      <service>
+        <serviceType>urn:schemas-nds-com:service:{0}:2</serviceType>
+        <serviceId>{1}</serviceId>
+        <controlURL>{2}</controlURL>
+      </service>
+    </serviceList>
+  </device>
+</root>"""
+EMULATOR_SOAP_ENVELOPE = (
+    '<?xml version="1.0"?>'
+    '<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/" '
+    's:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/"><s:Body>'
+    '<{0} xmlns:u="urn:schemas-nds-com:service:SkyPlay:2">{1}</{0}>'
+    "</s:Body></s:Envelope>"
+)
+
+
+class SkyQEmulator:
+    """Emulate the REST, UPnP/SOAP, websocket and remote control ports of a box.
+
+    The SOAP, websocket and remote control ports are fixed by the box, so run
+    each emulator on its own loopback address (127.0.0.2, 127.0.0.3, ...).
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        json_port=9006,
+        port=49160,
+        channels=100,
+        recordings=50,
+        epg_days=7,
+        events_per_day=24,
+        latency=0,
+        jitter=0,
+        failure_rate=0,
+        description_index=3,
+        device_type="GATEWAYSTB",
+        serial_number="0123456789",
+        seed=0,
+    ):
+        """Initialise the emulator and its data, call start() to serve it."""
+        self.host = host
+        self.json_port = json_port
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.offline = False
+        self.description_index = description_index
+        self.device_type = device_type
+        self.serial_number = serial_number
+        self.epg_days = epg_days
+        self.events_per_day = events_per_day
+        self.transport_state = SKY_STATE_PLAYING
+        self.standby = False
+        self.requests = Counter()
+        self.commands = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._servers = []
+        self._websockets = []
+        self._stopped = threading.Event()
+
+        self.channels = [
+            {
+                "c": str(101 + index),
+                "t": f"Channel {101 + index}",
+                "sid": str(1000 + index),
+                "sf": "hd" if index % 2 == 0 else "sd",
+                "sg": 12,
+                "xsg": 3,
+            }
+            for index in range(channels)
+        ]
+        self.current_sid = int(self.channels[0]["sid"]) if self.channels else 1000
+        self.apps = [
+            {"appId": EMULATOR_EPG_APP, "title": "EPG", "status": "VISIBLE"},
+            {"appId": "com.bskyb.news", "title": "Sky News", "status": "RUNNING"},
+            {"appId": "com.bskyb.beehive", "title": "Music", "status": "RUNNING"},
+        ]
+        start = int(datetime.now(timezone.utc).timestamp()) - 86400
+        self.recordings = [
+            {
+                "pvrid": f"P{index:08X}",
+                "cn": self.channels[index % len(self.channels)]["t"]
+                if self.channels
+                else "Channel",
+                "t": f"Recording {index}",
+                "sy": f"Synopsis of recording {index}",
+                "status": "RECORDED",
+                "st": start - index * 3600,
+                "ast": start - index * 3600,
+                "schd": 3600,
+                "finald": 3600,
+                "osid": int(self.channels[index % len(self.channels)]["sid"])
+                if self.channels
+                else 1000,
+                "oeid": 10000 + index,
+                "seasonnumber": 1 + index // 10,
+                "episodenumber": 1 + index % 10,
+            }
+            for index in range(recordings)
+        ]
+
+    def __enter__(self):
+        """Start the emulator on entering the runtime context."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop the emulator on leaving the runtime context."""
+        self.stop()
+
+    @property
+    def schedule_url(self):
+        """Return the schedule url to pass to set_overrides(schedule_url=...)."""
+        return f"http://{self.host}:{self.json_port}/as/schedule/{{1}}/{{0}}"
+
+    def start(self):
+        """Start serving the box ports in background threads."""
+        self._stopped.clear()
+        handler = type("_Handler", (_EmulatorHTTPHandler,), {"emulator": self})
+        remote = type("_Remote", (_EmulatorRemoteHandler,), {"emulator": self})
+        for server in [
+            _EmulatorHTTPServer((self.host, self.json_port), handler),
+            _EmulatorHTTPServer((self.host, EMULATOR_SOAP_PORT), handler),
+            _EmulatorTCPServer((self.host, self.port), remote),
+        ]:
+            self._servers.append(server)
+            threading.Thread(
+                target=server.serve_forever,
+                name=f"skyq-emulator-{self.host}:{server.server_address[1]}",
+                daemon=True,
+            ).start()
+
+    def stop(self):
+        """Stop serving the box ports."""
+        self._stopped.set()
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+
+    def set_active_application(self, app_id):
+        """Make an application visible, pushing the change to websocket clients."""
+        for app in self.apps:
+            app["status"] = "VISIBLE" if app["appId"] == app_id else "RUNNING"
+        message = json.dumps({"apps": self.apps})
+        with self._lock:
+            for queue in self._websockets:
+                queue.put(message)
+
+    def schedule(self, sids, epg_date):
+        """Build the schedule service response for some sids on a day."""
+        day = datetime.strptime(epg_date, "%Y%m%d").replace(tzinfo=timezone.utc)
+        today = datetime.now(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        if not today - timedelta(days=1) <= day < today + timedelta(days=self.epg_days):
+            return {"schedule": []}
+
+        duration = 86400 // max(self.events_per_day, 1)
+        start = int(day.timestamp())
+        return {
+            "schedule": [
+                {
+                    "sid": sid,
+                    "events": [
+                        {
+                            "st": start + event * duration,
+                            "d": duration,
+                            "eid": f"E{sid}-{epg_date}-{event}",
+                            "programmeuuid": f"{sid}{epg_date}{event:03d}",
+                            "t": f"Programme {event} on {sid}",
+                            "sy": f"Synopsis of programme {event} on {sid}",
+                            "seasonnumber": 1 + event % 5,
+                            "episodenumber": 1 + event,
+                        }
+                        for event in range(self.events_per_day)
+                    ],
+                }
+                for sid in sids
+            ]
+        }
+
+    def rest_response(self, method, path, query):
+        """Return the status and JSON body for a REST call."""
+        if path == "system/deviceinformation":
+            return HTTPStatus.OK, {
+                "ASVersion": "Q200.000.00.00L (53wh8d8)",
+                "IPAddress": self.host,
+                "countryCode": "GBR",
+                "gateway": self.device_type == "GATEWAYSTB",
+                "hardwareName": "Falcon",
+                "modelNumber": "Q200.000.00.00",
+                "serialNumber": self.serial_number,
+                "versionNumber": "32B12D",
+                "bouquet": 4101,
+                "subbouquet": 1,
+            }
+        if path == "system/information":
+            return HTTPStatus.OK, {
+                "gatewayIPAddress": self.host,
+                "hardwareModel": "ES240",
+                "deviceType": self.device_type,
+                "manufacturer": "Sky",
+                "wakeReason": "ECO",
+                "systemUptime": 1000,
+                "hdrCapable": True,
+                "uhdCapable": True,
+                "activeStandby": self.standby,
+            }
+        if path == "system/time":
+            now = int(time.time())
+            return HTTPStatus.OK, {
+                "presentLocalTimeOffset": 0,
+                "utc": now,
+                "futureLocalTimeOffset": 3600,
+                "futureTransitionUtc": now + 86400,
+            }
+        if path == "services/favourites":
+            return HTTPStatus.OK, {
+                "favourites": [
+                    {"lcn": index + 1, "sid": channel["sid"]}
+                    for index, channel in enumerate(self.channels[:10])
+                ]
+            }
+        if path.startswith("services/"):
+            return HTTPStatus.OK, {"documentId": "1", "services": self.channels}
+        if path == "apps":
+            return HTTPStatus.OK, {"apps": self.apps}
+        if path.startswith("schedule/"):
+            _, epg_date, sids = path.split("/", 2)
+            return HTTPStatus.OK, self.schedule(sids.split(","), epg_date)
+        if path == "pvr/storage":
+            return HTTPStatus.OK, {
+                "userQuotaMax": 1000000,
+                "userQuotaUsed": 3600 * len(self.recordings),
+            }
+        if path.startswith("pvr/details/"):
+            pvrid = path[len("pvr/details/") :]
+            for recording in self.recordings:
+                if recording["pvrid"] == pvrid:
+                    return HTTPStatus.OK, {"details": recording}
+            return HTTPStatus.NOT_FOUND, {}
+        if path.startswith("pvr/action/") and method == "POST":
+            return HTTPStatus.OK, {}
+        if path == "pvr" and method == "DELETE":
+            return HTTPStatus.OK, {}
+        if path in ["pvr", "pvr/"]:
+            limit = int(query.get("limit", ["1000"])[0])
+            offset = int(query.get("offset", ["0"])[0])
+            return HTTPStatus.OK, {"pvrItems": self.recordings[offset : offset + limit]}
+        return HTTPStatus.NOT_FOUND, {}
+
+    def soap_response(self, action):
+        """Return the status and envelope for a SOAP action."""
+        if action == "GetTransportInfo":
+            body = (
+                f"<CurrentTransportState>{self.transport_state}"
+                "</CurrentTransportState>"
+                "<CurrentTransportStatus>OK</CurrentTransportStatus>"
+                "<CurrentSpeed>1</CurrentSpeed>"
+            )
+        elif action == "GetMediaInfo":
+            body = (
+                "<NrTracks>1</NrTracks><MediaDuration>0:00:00</MediaDuration>"
+                f"<CurrentURI>xsi://{self.current_sid:X}</CurrentURI>"
+                "<CurrentURIMetaData>NOT_IMPLEMENTED</CurrentURIMetaData>"
+                "<PlayMedium>NETWORK</PlayMedium>"
+            )
+        else:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, ""
+        return HTTPStatus.OK, EMULATOR_SOAP_ENVELOPE.format(
+            SOAP_RESPONSE.format(action), body
+        )
+
+    def press(self, code):
+        """Apply a key press received on the remote control port."""
+        self.commands.append(code)
+        if code == COMMANDS["play"]:
+            self.transport_state = SKY_STATE_PLAYING
+        elif code == COMMANDS["pause"]:
+            self.transport_state = SKY_STATE_PAUSED
+        elif code == COMMANDS["stop"]:
+            self.transport_state = SKY_STATE_STOPPED
+        elif code == COMMANDS["power"]:
+            self.standby = not self.standby
+        elif code in [COMMANDS["channelup"], COMMANDS["channeldown"]]:
+            sids = [int(channel["sid"]) for channel in self.channels]
+            if self.current_sid in sids:
+                step = 1 if code == COMMANDS["channelup"] else -1
+                index = (sids.index(self.current_sid) + step) % len(sids)
+                self.current_sid = sids[index]
+
+    def delay(self):
+        """Wait for the configured latency and jitter."""
+        wait = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        if wait > 0:
+            time.sleep(wait)
+
+    def should_fail(self):
+        """Return whether to inject a failure into this call."""
+        return self.failure_rate > 0 and self._random.random() < self.failure_rate
+
+
+class _EmulatorHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def handle_error(self, request, client_address):
+        _LOGGER.debug("Emulator - Connection error: %s", client_address)
+
+
+class _EmulatorTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def handle_error(self, request, client_address):
+        _LOGGER.debug("Emulator - Connection error: %s", client_address)
+
+
+class _EmulatorHTTPHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes on kept-alive connections
+    disable_nagle_algorithm = True
+    emulator = None
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        _LOGGER.debug("Emulator - %s", format % args)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self._handle("GET")
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self._handle("POST")
+
+    def do_DELETE(self):  # pylint: disable=invalid-name
+        self._handle("DELETE")
+
+    def _handle(self, method):
+        emulator = self.emulator
+        url = urlsplit(self.path)
+        emulator.requests[url.path] += 1
+        if length := int(self.headers.get("Content-Length", 0)):
+            self.rfile.read(length)
+        if emulator.offline:
+            # Drop the connection, as an unplugged box would
+            self.close_connection = True
+            return
+        emulator.delay()
+        if emulator.should_fail():
+            self.close_connection = True
+            return
+
+        if self.server.server_address[1] == EMULATOR_SOAP_PORT:
+            self._handle_upnp(method, url.path)
+        elif url.path == "/as/apps/status":
+            self._handle_websocket()
+        elif url.path.startswith("/as/"):
+            status, body = emulator.rest_response(
+                method, url.path[len("/as/") :], parse_qs(url.query)
+            )
+            self._send(status, json.dumps(body).encode("utf-8"), "application/json")
+        else:
+            self._send(HTTPStatus.NOT_FOUND, b"", "text/plain")
+
+    def _handle_upnp(self, method, path):
+        emulator = self.emulator
+        if method == "POST" and path == EMULATOR_CONTROL_URL:
+            action = self.headers.get("SOAPACTION", "").strip('"').split("#")[-1]
+            status, body = emulator.soap_response(action)
+            self._send(status, body.encode("utf-8"), 'text/xml; charset="utf-8"')
+            return
+
+        if path.startswith("/description") and path.endswith(".xml"):
+            index = int(path[len("/description") : -len(".xml")] or 0)
+            if index == emulator.description_index:
+                body = EMULATOR_DESCRIPTION.format(
+                    "SkyControl", "urn:nds-com:serviceId:SkyPlay", EMULATOR_CONTROL_URL
+                )
+            elif index < EMULATOR_DESCRIPTIONS:
+                body = EMULATOR_DESCRIPTION.format(
+                    "SkyServe", "urn:nds-com:serviceId:SkyServe", "/SkyServe"
+                )
+            else:
+                body = None
+            if body:
+                self._send(HTTPStatus.OK, body.encode("utf-8"), "text/xml")
+                return
+        self._send(HTTPStatus.NOT_FOUND, b"", "text/plain")
+
+    def _handle_websocket(self):
+        emulator = self.emulator
+        key = self.headers.get("Sec-WebSocket-Key", "")
+        accept = base64.b64encode(
+            hashlib.sha1((key + EMULATOR_WS_GUID).encode("ascii")).digest()
+        ).decode("ascii")
+        self.send_response(HTTPStatus.SWITCHING_PROTOCOLS)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.close_connection = True
+
+        queue = Queue()
+        queue.put(json.dumps({"apps": emulator.apps}))
+        with emulator._lock:  # pylint: disable=protected-access
+            emulator._websockets.append(queue)  # pylint: disable=protected-access
+        try:
+            self._serve_websocket(queue)
+        except OSError:
+            pass
+        finally:
+            with emulator._lock:  # pylint: disable=protected-access
+                emulator._websockets.remove(queue)  # pylint: disable=protected-access
+
+    def _serve_websocket(self, queue):
+        stopped = self.emulator._stopped  # pylint: disable=protected-access
+        while not stopped.is_set() and not self.emulator.offline:
+            try:
+                while True:
+                    self._send_frame(0x1, queue.get_nowait().encode("utf-8"))
+            except Empty:
+                pass
+            readable, _, _ = select.select([self.connection], [], [], 0.1)
+            if not readable:
+                continue
+            opcode, payload = self._read_frame()
+            if opcode is None or opcode == 0x8:
+                self._send_frame(0x8, payload or b"")
+                return
+            if opcode == 0x9:
+                self._send_frame(0xA, payload)
+
+    def _read_frame(self):
+        header = self.rfile.read(2)
+        if len(header) < 2:
+            return None, None
+        opcode = header[0] & 0x0F
+        length = header[1] & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", self.rfile.read(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", self.rfile.read(8))[0]
+        mask = self.rfile.read(4) if header[1] & 0x80 else bytes(4)
+        payload = self.rfile.read(length)
+        return opcode, bytes(
+            byte ^ mask[index % 4] for index, byte in enumerate(payload)
+        )
+
+    def _send_frame(self, opcode, payload):
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 65536:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        self.wfile.write(header + payload)
+        self.wfile.flush()
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _EmulatorRemoteHandler(socketserver.BaseRequestHandler):
+    emulator = None
+
+    def handle(self):
+        emulator = self.emulator
+        if emulator.offline:
+            return
+        emulator.delay()
+        client = self.request
+        try:
+            client.sendall(b"SKY 000.001\n")
+            client.recv(12)
+            client.sendall(b"\x01")
+            client.recv(1)
+            client.sendall(bytes(4))
+            client.recv(1)
+            client.sendall(bytes(24))
+
+            pending = b""
+            while not emulator.offline and (data := client.recv(1024)):
+                pending += data
+                while len(pending) >= 8:
+                    frame, pending = pending[:8], pending[8:]
+                    # Key down frames carry a 1, key up frames a 0
+                    if frame[1] == 1:
+                        emulator.press((frame[6] - 224) * 16 + frame[7])
+        except OSError:
+            pass
+
+
+def main():
+    """Run an emulator from the command line."""
+    parser = argparse.ArgumentParser(description="Emulate a Sky Q box.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--json-port", type=int, default=9006)
+    parser.add_argument("--port", type=int, default=49160)
+    parser.add_argument("--channels", type=int, default=100)
+    parser.add_argument("--recordings", type=int, default=50)
+    parser.add_argument("--epg-days", type=int, default=7)
+    parser.add_argument("--events-per-day", type=int, default=24)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--jitter", type=float, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0)
+    args = parser.parse_args()
+
+    emulator = SkyQEmulator(
+        args.host,
+        args.json_port,
+        args.port,
+        channels=args.channels,
+        recordings=args.recordings,
+        epg_days=args.epg_days,
+        events_per_day=args.events_per_day,
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+    )
+    with emulator:
+        print(f"Emulating a Sky Q box on {args.host}, schedule url:")
+        print(emulator.schedule_url)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Polling of many SkyQ boxes on a shared pool of workers."""
+
+import heapq
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from .classes.remotecontrol import Latency
+from .const import FLEET_MAX_WORKERS, FLEET_POLL_INTERVAL, SKY_STATE_ON
+from .skyq_remote import SkyQRemote
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class FleetStatus:
+    """The state of one box, from one poll."""
+
+    host: str = field(
+        init=True,
+        repr=True,
+        compare=False,
+    )
+    power: str = field(
+        default=None,
+        init=True,
+        repr=True,
+        compare=False,
+    )
+    transport: object = field(
+        default=None,
+        init=True,
+        repr=True,
+        compare=False,
+    )
+    media: object = field(
+        default=None,
+        init=True,
+        repr=True,
+        compare=False,
+    )
+    app: object = field(
+        default=None,
+        init=True,
+        repr=True,
+        compare=False,
+    )
+    error: str = field(
+        default=None,
+        init=True,
+        repr=True,
+        compare=False,
+    )
+    reachable: bool = field(
+        default=None,
+        init=True,
+        repr=True,
+        compare=False,
+    )
+    polled: datetime = field(
+        default=None,
+        init=True,
+        repr=True,
+        compare=False,
+    )
+    elapsed: float = field(
+        default=None,
+        init=True,
+        repr=True,
+        compare=False,
+    )
+
+    @property
+    def ok(self):  # pylint: disable=invalid-name
+        """Return whether the box answered the poll, whatever its power state."""
+        return self.error is None and self.reachable is not False
+
+
+@dataclass
+class _BoxStats:
+    polls: int = 0
+    errors: int = 0
+    latency: Latency = field(default_factory=Latency)
+    last_success: float = None
+
+
+class SkyQFleet:
+    """Poll power, transport state, media and active app of many boxes."""
+
+    def __init__(
+        self,
+        poll_interval=FLEET_POLL_INTERVAL,
+        max_workers=FLEET_MAX_WORKERS,
+        **remote_options,
+    ):
+        """Initialise the fleet, with no boxes and a shared pool of workers."""
+        self.poll_interval = poll_interval
+        self._remote_options = {"background_setup": True, **remote_options}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="skyq-fleet"
+        )
+        self._lock = threading.Lock()
+        self._remotes = {}
+        self._box_stats = {}
+        self._stopped = threading.Event()
+
+    def __enter__(self):
+        """Enter the runtime context for the fleet."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the fleet on leaving the runtime context."""
+        self.close()
+
+    @property
+    def hosts(self):
+        """Return the hosts in the fleet."""
+        return list(self._remotes)
+
+    def add(self, host, **remote_options):
+        """Add a box to the fleet, set up in the background."""
+        with self._lock:
+            if host not in self._remotes:
+                self._remotes[host] = SkyQRemote(
+                    host, **{**self._remote_options, **remote_options}
+                )
+                self._box_stats[host] = _BoxStats()
+            return self._remotes[host]
+
+    def remove(self, host):
+        """Remove a box from the fleet, closing its connections."""
+        with self._lock:
+            remote = self._remotes.pop(host, None)
+            self._box_stats.pop(host, None)
+        if remote:
+            remote.close()
+
+    def remote(self, host):
+        """Return the SkyQRemote for a box in the fleet."""
+        return self._remotes[host]
+
+    def poll(self):
+        """Poll every box once, yielding each FleetStatus as it arrives."""
+        polls = [
+            self._executor.submit(self._poll, host, remote)
+            for host, remote in list(self._remotes.items())
+        ]
+        while polls:
+            done, pending = wait(polls, return_when=FIRST_COMPLETED)
+            for poll in done:
+                yield poll.result()
+            polls = list(pending)
+
+    def stream(self):
+        """Poll every box each poll_interval, yielding each FleetStatus until stop()."""
+        # Spread the first polls over the interval, and start boxes added
+        # later at a random point in it, so the boxes aren't polled in bursts
+        self._stopped.clear()
+        start = time.monotonic()
+        hosts = self.hosts
+        schedule = [
+            (start + index * self.poll_interval / len(hosts), host)
+            for index, host in enumerate(hosts)
+        ]
+        heapq.heapify(schedule)
+        scheduled = set(hosts)
+        polls = {}
+
+        while not self._stopped.is_set():
+            now = time.monotonic()
+            for host in set(self._remotes) - scheduled:
+                heapq.heappush(
+                    schedule, (now + random.uniform(0, self.poll_interval), host)
+                )
+                scheduled.add(host)
+
+            while schedule and schedule[0][0] <= now:
+                due, host = heapq.heappop(schedule)
+                remote = self._remotes.get(host)
+                if not remote:
+                    scheduled.discard(host)
+                    continue
+                if host not in polls.values():
+                    # A box still answering its last poll misses this one
+                    polls[self._executor.submit(self._poll, host, remote)] = host
+                heapq.heappush(schedule, (due + self.poll_interval, host))
+
+            timeout = schedule[0][0] - now if schedule else self.poll_interval
+            if not polls:
+                self._stopped.wait(max(timeout, 0))
+                continue
+            done, _ = wait(polls, timeout=max(timeout, 0), return_when=FIRST_COMPLETED)
+            for poll in done:
+                del polls[poll]
+                yield poll.result()
+
+    def stop(self):
+        """Stop a running stream() after the polls in progress."""
+        self._stopped.set()
+
+    def stats(self):
+        """Get the latency, errors and staleness of each box in the fleet."""
+        now = time.monotonic()
+        with self._lock:
+            box_stats = list(self._box_stats.items())
+        return {
+            host: {
+                "polls": stats.polls,
+                "errors": stats.errors,
+                "latency": {
+                    "mean": stats.latency.mean,
+                    "maximum": stats.latency.maximum,
+                    "last": stats.latency.last,
+                },
+                "seconds_since_success": now - stats.last_success
+                if stats.last_success is not None
+                else None,
+                "circuit": self._remotes[host].circuit_breaker.state
+                if host in self._remotes
+                else None,
+            }
+            for host, stats in box_stats
+        }
+
+    def close(self):
+        """Stop polling and close the connections to every box."""
+        self.stop()
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            remotes = list(self._remotes.values())
+            self._remotes = {}
+        for remote in remotes:
+            remote.close()
+
+    def _poll(self, host, remote):
+        start = time.monotonic()
+        status = FleetStatus(host, polled=datetime.now(tz=timezone.utc))
+        try:
+            status.power = remote.power_status()
+            if status.power == SKY_STATE_ON:
+                status.transport = remote.get_current_state()
+                status.media = remote.get_current_media()
+                status.app = remote.get_active_application()
+            # Powered off or in standby is a normal state, not reaching the box
+            # (including while the circuit breaker is open) is a failure
+            status.reachable = remote.circuit_breaker.consecutive_failures == 0
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.exception("X0010FL - Poll failed: %s : %s", host, err)
+            status.error = f"{type(err).__name__}: {err}"
+        status.elapsed = time.monotonic() - start
+
+        with self._lock:
+            stats = self._box_stats.get(host)
+            if stats:
+                stats.polls += 1
+                stats.latency.record(status.elapsed)
+                if status.ok:
+                    stats.last_success = time.monotonic()
+                else:
+                    stats.errors += 1
+        return status
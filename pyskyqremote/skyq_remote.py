@@ -1,28 +1,55 @@
 """Python module for accessing SkyQ box and EPG, and sending commands."""
 
 import logging
+import random
+import threading
+import time
 from datetime import datetime, timezone
 
 from .classes.app import AppInformation
 from .classes.channel import ChannelInformation
+from .classes.channellineup import SHARED_CHANNEL_LINEUPS
 from .classes.channelepg import ChannelEPGInformation
 from .classes.device import DeviceInformation, TransportInfo
 from .classes.deviceaccess import DeviceAccess
+from .classes.epgstore import SHARED_EPG_STORE
 from .classes.favourite import FavouriteInformation
 from .classes.media import MediaInformation
 from .classes.programme import Programme
 from .classes.recordings import RecordingsInformation
+from .classes.snapshot import RemoteSnapshot
+from .classes.stats import CacheStats, approximate_size
+from .classes.tracing import TraceCollector
+from .classes.transportfixtures import TransportFixtures
 from .const import (
     ALLRECORDINGS,
+    CACHE_APPS,
+    CACHE_CHANNELS,
+    CACHE_EPG,
+    CACHE_EPG_STORE,
+    CACHE_NAMES,
+    CACHE_PROGRAMME,
+    CACHE_RECORDING,
+    CIRCUIT_CLOSED,
+    CIRCUIT_FAILURE_THRESHOLD,
     COMMANDS,
+    EPG_BATCH_SIZE,
     EPG_ERROR_NO_DATA,
     EPG_ERROR_PAST_END,
-    SKY_STATE_OFF,
-    SKY_STATE_ON,
-    SKY_STATE_STANDBY,
+    FIXTURE_RECORD,
+    REST_POOL_SIZE,
+    SCHEDULE_URL,
+    SCHEDULER_MAX_IN_FLIGHT,
+    SETUP_COMPLETE,
+    SETUP_FAILED,
+    SETUP_IN_PROGRESS,
+    SETUP_PENDING,
     SKY_STATE_UNSUPPORTED,
+    SNAPSHOT_REVALIDATE_JITTER,
+    SOAP_POOL_SIZE,
     TERRITORIES,
     UNSUPPORTED_DEVICES,
+    UPNP_GET_TRANSPORT_INFO,
     URL_PREFIX,
 )
 
@@ -34,9 +61,33 @@ class SkyQRemote:
 
     commands = COMMANDS
 
-    def __init__(self, host, epg_cache_len=20, port=49160, json_port=9006):
+    def __init__(
+        self,
+        host,
+        epg_cache_len=20,
+        port=49160,
+        json_port=9006,
+        rest_pool_size=REST_POOL_SIZE,
+        soap_pool_size=SOAP_POOL_SIZE,
+        snapshot_dir=None,
+        background_setup=False,
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        max_in_flight=SCHEDULER_MAX_IN_FLIGHT,
+        fixture_dir=None,
+        fixture_mode=FIXTURE_RECORD,
+        replay_timing=1,
+        epg_store=None,
+        channel_lineups=None,
+        epg_batch_size=EPG_BATCH_SIZE,
+        epg_cache_ttl=None,
+        epg_cache_bytes=None,
+        network_stats=False,
+    ):
         """Stand up a new SkyQ box."""
         self._remote_setup = False
+        self._setup_status = SETUP_PENDING
+        self._setup_lock = threading.Lock()
+        self._setup_finished = threading.Event()
         self._device_type = None
         self._host = host
         self._override_country = None
@@ -56,37 +107,95 @@ class SkyQRemote:
         self._media_information = None
         self._recordings_information = None
 
-        self._remote_config = _RemoteConfig(host, port, json_port, epg_cache_len)
+        fixtures = None
+        if fixture_dir:
+            fixtures = TransportFixtures(fixture_dir, host, fixture_mode, replay_timing)
+        self._remote_config = _RemoteConfig(
+            host,
+            port,
+            json_port,
+            epg_cache_len,
+            rest_pool_size=rest_pool_size,
+            soap_pool_size=soap_pool_size,
+            failure_threshold=failure_threshold,
+            max_in_flight=max_in_flight,
+            fixtures=fixtures,
+            epg_store=epg_store,
+            channel_lineups=channel_lineups,
+            epg_batch_size=epg_batch_size,
+            epg_cache_ttl=epg_cache_ttl,
+            epg_cache_bytes=epg_cache_bytes,
+        )
+        self._snapshot = RemoteSnapshot(snapshot_dir, host) if snapshot_dir else None
+        # Only traced when asked for, so calls to the box skip the trace hooks
+        self._network_stats = None
+        if network_stats:
+            self._network_stats = TraceCollector()
+            self._remote_config.device_access.add_trace_hook(self._network_stats)
+        self._closed = threading.Event()
+
+        self._device_information = DeviceInformation(self._remote_config)
+
+        if self._restore_snapshot():
+            return
+        if background_setup:
+            threading.Thread(
+                target=self._setup_remote,
+                name=f"skyq-setup-{host}",
+                daemon=True,
+            ).start()
+        else:
+            self._setup_remote()
+
+    def __enter__(self):
+        """Enter the runtime context for the remote."""
+        return self
 
-        self._setup_remote()
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the remote on leaving the runtime context."""
+        self.close()
 
     @property
     def device_setup(self):
         """Get the dev ice setp state."""
         return self._remote_setup
 
+    @property
+    def setup_status(self):
+        """Get the progress of the device setup."""
+        return self._setup_status
+
+    def wait_for_setup(self, timeout=None):
+        """Wait for the device setup to finish, returning whether it succeeded."""
+        self._setup_finished.wait(timeout)
+        return self._remote_setup
+
     @property
     def device_type(self):
         """Get the device type of the Sky Q box."""
         return self._device_type
 
+    @property
+    def circuit_breaker(self):
+        """Get the circuit breaker tracking whether the Sky Q box is reachable."""
+        return self._remote_config.device_access.circuit_breaker
+
+    @property
+    def scheduler(self):
+        """Get the scheduler limiting the requests in flight to the Sky Q box."""
+        return self._remote_config.device_access.scheduler
+
     def power_status(self) -> str:
         """Get the power status of the Sky Q box."""
-        if not self._remote_setup:
+        if not self._remote_setup and self.circuit_breaker.state == CIRCUIT_CLOSED:
             self._setup_remote()
 
         system_info = self._device_information.get_system_information()
-
-        if system_info is None:
-            return SKY_STATE_OFF
-        if "activeStandby" in system_info and system_info["activeStandby"] is True:
-            return SKY_STATE_STANDBY
-
-        return SKY_STATE_ON
+        return self._device_information.build_power_status(system_info)
 
     def get_current_state(self):
         """Get current state of the SkyQ box."""
-        if not self._remote_setup:
+        if not self._remote_setup and self.circuit_breaker.state == CIRCUIT_CLOSED:
             self._setup_remote()
 
         if self._device_type in UNSUPPORTED_DEVICES:
@@ -101,6 +210,13 @@ class SkyQRemote:
 
         return self._app_information.get_active_application()
 
+    def subscribe_active_application(self, callback=None):
+        """Track the active application from the status pushed by the Sky Q box."""
+        if not self._app_information:
+            self._app_information = AppInformation(self._remote_config)
+
+        self._app_information.subscribe(callback)
+
     def get_current_media(self):
         """Get the currently playing media on the SkyQ box."""
         if not self._media_information:
@@ -115,6 +231,13 @@ class SkyQRemote:
 
         return self._channel_epg_information.get_epg_data(sid, epg_date, days)
 
+    def get_epg_bulk(self, sids, epg_date, days=2):
+        """Get EPG data for many channels, yielding (sid, epg, error) as each ends."""
+        if not self._channel_epg_information:
+            self._channel_epg_information = ChannelEPGInformation(self._remote_config)
+
+        return self._channel_epg_information.get_epg_bulk(sids, epg_date, days)
+
     def get_programme_from_epg(self, sid, epg_date, query_date):
         """Get programme from EPG for specfied time and channel."""
         sidint = 0
@@ -135,11 +258,14 @@ class SkyQRemote:
             self._error = False
 
         programme_epg = f'{sidint} {epg_date.strftime("%Y%m%d")}'
+        programme_stats = self._remote_config.cache_stats[CACHE_PROGRAMME]
         if (
             self._last_programme_epg == programme_epg
             and query_date < self._programme.endtime
         ):
+            programme_stats.hit()
             return self._programme
+        programme_stats.miss()
 
         epg_data = self.get_epg_data(sidint, epg_date)
 
@@ -164,6 +290,8 @@ class SkyQRemote:
                 if p.starttime <= query_date and p.endtime >= query_date
             )
 
+            if self._programme and self._programme is not programme:
+                programme_stats.evict()
             self._programme = programme
             self._last_programme_epg = programme_epg
             return programme
@@ -195,8 +323,13 @@ class SkyQRemote:
         if not self._recordings_information:
             self._recordings_information = RecordingsInformation(self._remote_config)
 
+        recording_stats = self._remote_config.cache_stats[CACHE_RECORDING]
         if self._last_pvr_id == pvrid:
+            recording_stats.hit()
             return self._recorded_programme
+        recording_stats.miss()
+        if self._last_pvr_id is not None:
+            recording_stats.evict()
         self._last_pvr_id = pvrid
 
         self._recorded_programme = self._recordings_information.get_recording(pvrid)
@@ -317,10 +450,127 @@ class SkyQRemote:
 
     def press(self, sequence):
         """Issue the specified sequence of commands to SkyQ box."""
-        self._remote_config.device_access.press(sequence)
+        return self._remote_config.device_access.press(sequence)
+
+    def set_key_timing(self, min_gap=None, profile=None):
+        """Tune the gaps left between keys when pressing a sequence."""
+        self._remote_config.device_access.key_sequencer.set_timing(min_gap, profile)
+
+    def stats(self):
+        """Get statistics on the caches and the calls made to the Sky Q box."""
+        epg_cache = (
+            self._channel_epg_information.epg_cache
+            if self._channel_epg_information
+            else {}
+        )
+        cache_contents = {
+            CACHE_APPS: self._remote_config.app_titles,
+            CACHE_CHANNELS: self._remote_config.channels or [],
+            CACHE_EPG: epg_cache,
+            CACHE_PROGRAMME: [self._programme] if self._programme else [],
+            CACHE_RECORDING: [self._recorded_programme]
+            if self._last_pvr_id is not None
+            else [],
+        }
+        caches = {}
+        for name in CACHE_NAMES:
+            cache_stats = self._remote_config.cache_stats[name]
+            caches[name] = {
+                "hits": cache_stats.hits,
+                "misses": cache_stats.misses,
+                "evictions": cache_stats.evictions,
+                "entries": len(cache_contents[name]),
+                "bytes": approximate_size(cache_contents[name]),
+            }
+        caches[CACHE_EPG]["capacity"] = self._remote_config.epg_cache_len
+        epg_store = self._remote_config.epg_store
+        caches[CACHE_EPG_STORE] = {
+            "hits": epg_store.cache_stats.hits,
+            "misses": epg_store.cache_stats.misses,
+            "evictions": epg_store.cache_stats.evictions,
+            "entries": len(epg_store),
+            "bytes": approximate_size(epg_store.days),
+            "capacity": epg_store.capacity,
+        }
+
+        network = {}
+        snapshot = self._network_stats.snapshot() if self._network_stats else {}
+        for (_, transport, endpoint), histogram in snapshot.items():
+            network.setdefault(transport, {})[endpoint] = {
+                "calls": histogram.count,
+                "errors": histogram.errors,
+                "bytes": histogram.received,
+                "seconds": histogram.total,
+            }
+
+        last_success = (
+            self._network_stats.last_success if self._network_stats else None
+        )
+        keys = {
+            device_type: {
+                command: {
+                    timing: {
+                        "count": latency.count,
+                        "mean": latency.mean,
+                        "maximum": latency.maximum,
+                    }
+                    for timing, latency in timings.items()
+                }
+                for command, timings in list(device_stats.items())
+            }
+            for device_type, device_stats in list(
+                self._remote_config.device_access.key_sequencer.stats.items()
+            )
+        }
+
+        return {
+            "caches": caches,
+            "network": network,
+            "keys": keys,
+            "seconds_since_success": time.monotonic() - last_success
+            if last_success is not None
+            else None,
+        }
+
+    def add_trace_hook(self, hook):
+        """Call the hook with a TransportTrace after every call to the Sky Q box."""
+        self._remote_config.device_access.add_trace_hook(hook)
+
+    def remove_trace_hook(self, hook):
+        """Stop calling a trace hook."""
+        self._remote_config.device_access.remove_trace_hook(hook)
+
+    def set_response_freshness(self, endpoint, seconds):
+        """Re-use responses from a REST path, SOAP or websocket method for a while."""
+        self._remote_config.device_access.single_flight.set_freshness(
+            endpoint, seconds
+        )
+
+    def close(self):
+        """Close the pooled connections to the SkyQ box."""
+        self._closed.set()
+        self.save_snapshot()
+        self._remote_config.device_access.close()
+
+    def save_snapshot(self):
+        """Save the Sky Q box state for a warm start, if a snapshot_dir is set."""
+        if not self._snapshot or not self._remote_config.device_info:
+            return
+
+        self._snapshot.save(
+            self._remote_config.device_info,
+            self._remote_config.channels,
+            self._remote_config.app_titles,
+            self._remote_config.device_access.soap_control_url,
+        )
 
     def set_overrides(
-        self, override_country=None, test_channel=None, json_port=None, port=None
+        self,
+        override_country=None,
+        test_channel=None,
+        json_port=None,
+        port=None,
+        schedule_url=None,
     ):
         """Override various items."""
         if override_country:
@@ -331,14 +581,107 @@ class SkyQRemote:
             self._remote_config.json_port = json_port
         if port:
             self._remote_config.port = port
+        if schedule_url:
+            self._remote_config.schedule_url = schedule_url
 
     def _setup_remote(self):
-        device_info = self.get_device_information()
-        if not device_info:
+        # Don't queue behind a setup that is already running, e.g. in background
+        if not self._setup_lock.acquire(  # pylint: disable=consider-using-with
+            blocking=False
+        ):
+            return
+        try:
+            self._setup_finished.clear()
+            self._setup_status = SETUP_IN_PROGRESS
+            device_info = self.get_device_information()
+            if not device_info:
+                self._setup_status = SETUP_FAILED
+                return
+
+            self._remote_setup = True
+            self._device_type = self._remote_config.device_info.deviceType
+            self._setup_status = SETUP_COMPLETE
+        except Exception as err:  # pylint: disable=broad-except
+            # Left failed, so the next power_status() or get_current_state()
+            # tries the setup again
+            _LOGGER.exception("X0020 - Setup failed: %s : %s", self._host, err)
+            self._remote_setup = False
+            self._setup_status = SETUP_FAILED
             return
+        finally:
+            self._setup_finished.set()
+            self._setup_lock.release()
 
+        if self._device_type in UNSUPPORTED_DEVICES:
+            self.save_snapshot()
+            return
+
+        discovery = self._remote_config.device_access.discover_soap_control_url()
+        if self._snapshot:
+            discovery.add_done_callback(lambda _: self.save_snapshot())
+
+    def _restore_snapshot(self):
+        if not self._snapshot:
+            return False
+        snapshot = self._snapshot.load()
+        if not snapshot:
+            return False
+
+        self._device_information = DeviceInformation(self._remote_config)
+        self._remote_config.set_device_info(snapshot["device"])
+        self._remote_config.channels = snapshot["channels"]
+        self._remote_config.app_titles.update(snapshot["app_titles"] or {})
+        self._remote_config.device_access.set_soap_control_url(
+            snapshot["soap_control_url"]
+        )
         self._remote_setup = True
-        self._device_type = self._remote_config.device_info.deviceType
+        self._device_type = snapshot["device"].deviceType
+        self._setup_status = SETUP_COMPLETE
+        self._setup_finished.set()
+        threading.Thread(
+            target=self._revalidate_snapshot,
+            name=f"skyq-snapshot-{self._host}",
+            daemon=True,
+        ).start()
+        return True
+
+    def _revalidate_snapshot(self):
+        # Spread the revalidation out, so a restart doesn't hit every box at once
+        if self._closed.wait(random.uniform(0, SNAPSHOT_REVALIDATE_JITTER)):
+            return
+
+        previous_info = self._remote_config.device_info
+        device_info = self._device_information.get_device_information(
+            self._override_country
+        )
+        if not device_info:
+            # Box not available, carry on serving from the snapshot
+            return
+
+        if (
+            device_info.serialNumber != previous_info.serialNumber
+            or device_info.bouquet != previous_info.bouquet
+            or device_info.subbouquet != previous_info.subbouquet
+        ):
+            cache_stats = self._remote_config.cache_stats
+            if self._remote_config.channels:
+                cache_stats[CACHE_CHANNELS].evict(len(self._remote_config.channels))
+            cache_stats[CACHE_APPS].evict(len(self._remote_config.app_titles))
+            self._remote_config.channels = None
+            self._remote_config.app_titles.clear()
+        self._remote_config.set_device_info(device_info)
+        self._device_type = device_info.deviceType
+
+        device_access = self._remote_config.device_access
+        if self._device_type not in UNSUPPORTED_DEVICES and (
+            not device_access.soap_control_url
+            or device_access.call_sky_soap_service(UPNP_GET_TRANSPORT_INFO) is None
+        ):
+            device_access.set_soap_control_url(None)
+            device_access.discover_soap_control_url().result()
+
+        if not self._closed.is_set():
+            self.save_snapshot()
 
 
 class _RemoteConfig:
@@ -362,19 +705,48 @@ class _RemoteConfig:
         remote_country=None,
         test_channel=None,
         device_info=None,
+        rest_pool_size=REST_POOL_SIZE,
+        soap_pool_size=SOAP_POOL_SIZE,
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        max_in_flight=SCHEDULER_MAX_IN_FLIGHT,
+        fixtures=None,
+        epg_store=None,
+        channel_lineups=None,
+        epg_batch_size=EPG_BATCH_SIZE,
+        epg_cache_ttl=None,
+        epg_cache_bytes=None,
     ):
         self.host = host
         self.port = port
         self.json_port = json_port
-        self.device_access = device_access
         self.remote_country = remote_country
         self.territory = None
         self.test_channel = test_channel
         self.epg_cache_len = epg_cache_len
-        self.device_access = DeviceAccess(host, json_port, port)
+        self.epg_cache_ttl = epg_cache_ttl
+        self.epg_cache_bytes = epg_cache_bytes
+        self.epg_batch_size = epg_batch_size
+        self.device_access = device_access or DeviceAccess(
+            host,
+            json_port,
+            port,
+            rest_pool_size,
+            soap_pool_size,
+            failure_threshold,
+            max_in_flight,
+            fixtures,
+        )
         self.device_info = device_info
         self.territory = None
         self.url_prefix = None
+        self.schedule_url = SCHEDULE_URL
+        self.channels = None
+        self.app_titles = {}
+        self.cache_stats = {name: CacheStats() for name in CACHE_NAMES}
+        self.epg_store = epg_store if epg_store is not None else SHARED_EPG_STORE
+        self.channel_lineups = (
+            channel_lineups if channel_lineups is not None else SHARED_CHANNEL_LINEUPS
+        )
 
     def set_device_info(self, device_info):
         """Initilise the device info for the Sky Q box."""
@@ -382,3 +754,4 @@ class _RemoteConfig:
         self.territory = TERRITORIES[device_info.used_country_code]
         self.url_prefix = URL_PREFIX[device_info.used_country_code]
         self.device_access.ipaddress = device_info.IPAddress
+        self.device_access.key_sequencer.device_type = device_info.deviceType
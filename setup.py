@@ -19,7 +19,8 @@ setup(
     url='https://github.com/RogerSelwyn/skyq_remote',
     license='MIT',
     packages=find_namespace_packages(exclude=['tests','manage']),
-    install_requires=['requests>=2.24.0', 'websocket-client>=0.56.0', 'xmltodict>=0.12.0'],
+    install_requires=['requests>=2.24.0', 'urllib3>=1.26.0', 'websocket-client>=0.56.0', 'xmltodict>=0.12.0'],
+    extras_require={'async': ['aiohttp>=3.8.0']},
     keywords='SKYQ Remote',
     include_package_data=True,
     zip_safe=False,
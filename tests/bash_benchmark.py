@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+"""Benchmark script for the client's hot paths, run against the emulator."""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from pyskyqremote.classes.app import app_decoder
+from pyskyqremote.classes.channel import (
+    ChannelInformation,
+    channel_decoder,
+    channel_list_decoder,
+)
+from pyskyqremote.classes.channelepg import ChannelEPGInformation, channel_epg_decoder
+from pyskyqremote.classes.device import device_decoder, transportinfo_decoder
+from pyskyqremote.classes.favourite import (
+    FavouriteInformation,
+    favourite_decoder,
+    favourite_list_decoder,
+)
+from pyskyqremote.classes.media import media_decoder
+from pyskyqremote.classes.programme import programmedecoder
+from pyskyqremote.classes.recordings import (
+    RecordingsInformation,
+    quota_decoder,
+    recordingdecoder,
+    recordings_decoder,
+)
+from pyskyqremote.const import ALLRECORDINGS
+from pyskyqremote.emulator import SkyQEmulator
+from pyskyqremote.skyq_remote import SkyQRemote
+
+# Run ./bash_benchmark.py [--iterations 20] [--output results.json]
+# example: ./bash_benchmark.py --host 127.0.0.2 --channels 500 --recordings 1000
+# Each benchmark reports the wall time of each iteration, and the bytes and
+# blocks allocated and peak memory of one further iteration under tracemalloc.
+
+
+def measure(function, iterations):
+    """Time the function, then trace the memory of one more call."""
+    function()  # Warm up connections and lazily built state
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = [
+        stat for stat in after.compare_to(before, "filename") if stat.size_diff > 0
+    ]
+
+    return {
+        "iterations": iterations,
+        "wall_time": {
+            "min": min(timings),
+            "mean": sum(timings) / len(timings),
+            "max": max(timings),
+        },
+        "allocated_bytes": sum(stat.size_diff for stat in allocated),
+        "allocated_blocks": sum(max(stat.count_diff, 0) for stat in allocated),
+        "peak_bytes": peak,
+    }
+
+
+def json_pair(obj, decoder):
+    """Return a benchmark of encoding an object as JSON and decoding it."""
+    return lambda: decoder(obj.as_json())
+
+
+def build_benchmarks(sky, emulator, sid):
+    """Build the named benchmarks against a remote connected to the emulator."""
+    remote_config = sky._remote_config  # pylint: disable=protected-access
+    epg_date = datetime.now(timezone.utc)
+    query_dates = [
+        epg_date.replace(hour=hour, minute=30, second=0, microsecond=0)
+        for hour in range(24)
+    ]
+    query_index = iter(range(sys.maxsize))
+
+    channel_list = sky.get_channel_list()
+    favourite_list = sky.get_favourite_list()
+    channel_epg = sky.get_epg_data(sid, epg_date, 7)
+    recordings = sky.get_recordings(ALLRECORDINGS, len(emulator.recordings))
+    recording = next(iter(recordings.recordings))
+
+    def fetch_epg(days):
+        remote_config.epg_store.clear()
+        return ChannelEPGInformation(remote_config).get_epg_data(sid, epg_date, days)
+
+    def fetch_channel_list():
+        remote_config.channel_lineups.clear()
+        remote_config.channels = None
+        return ChannelInformation(remote_config).get_channel_list()
+
+    return {
+        "epg_1_day": lambda: fetch_epg(1),
+        "epg_7_days": lambda: fetch_epg(7),
+        "programme_from_epg": lambda: sky.get_programme_from_epg(
+            sid, epg_date, query_dates[next(query_index) % len(query_dates)]
+        ),
+        "recordings": lambda: RecordingsInformation(remote_config).get_recordings(
+            ALLRECORDINGS, len(emulator.recordings), 0
+        ),
+        "channel_list": fetch_channel_list,
+        "favourite_list": lambda: FavouriteInformation(
+            remote_config
+        ).get_favourite_list(channel_list),
+        "transport_info_poll": sky.get_current_state,
+        "media_info_poll": sky.get_current_media,
+        "json_device": json_pair(sky.get_device_information(), device_decoder),
+        "json_transport_info": json_pair(
+            sky.get_current_state(), transportinfo_decoder
+        ),
+        "json_media": json_pair(sky.get_current_media(), media_decoder),
+        "json_app": json_pair(sky.get_active_application(), app_decoder),
+        "json_channel": json_pair(next(iter(channel_list.channels)), channel_decoder),
+        "json_channel_list": json_pair(channel_list, channel_list_decoder),
+        "json_favourite": json_pair(
+            next(iter(favourite_list.favourites)), favourite_decoder
+        ),
+        "json_favourite_list": json_pair(favourite_list, favourite_list_decoder),
+        "json_channel_epg": json_pair(channel_epg, channel_epg_decoder),
+        "json_programme": json_pair(channel_epg.programmes[0], programmedecoder),
+        "json_recording": json_pair(recording, recordingdecoder),
+        "json_recordings": json_pair(recordings, recordings_decoder),
+        "json_quota": json_pair(sky.get_quota(), quota_decoder),
+    }
+
+
+parser = argparse.ArgumentParser(description="Benchmark the Sky Q client.")
+parser.add_argument("--host", default="127.0.0.2")
+parser.add_argument("--iterations", type=int, default=20)
+parser.add_argument("--channels", type=int, default=500)
+parser.add_argument("--recordings", type=int, default=1000)
+parser.add_argument("--events-per-day", type=int, default=48)
+parser.add_argument("--latency", type=float, default=0)
+parser.add_argument("--only", nargs="*", help="names of the benchmarks to run")
+parser.add_argument("--output", help="file to write the results to")
+args = parser.parse_args()
+
+with SkyQEmulator(
+    args.host,
+    channels=args.channels,
+    recordings=args.recordings,
+    events_per_day=args.events_per_day,
+    epg_days=7,
+    latency=args.latency,
+) as sky_emulator:
+    with SkyQRemote(args.host, epg_cache_len=args.channels) as sky_remote:
+        sky_remote.set_overrides(schedule_url=sky_emulator.schedule_url)
+        benchmarks = build_benchmarks(
+            sky_remote, sky_emulator, int(sky_emulator.channels[0]["sid"])
+        )
+        results = {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "emulator": {
+                "channels": args.channels,
+                "recordings": args.recordings,
+                "events_per_day": args.events_per_day,
+                "latency": args.latency,
+            },
+            "benchmarks": {},
+        }
+        for name, benchmark in benchmarks.items():
+            if args.only and name not in args.only:
+                continue
+            results["benchmarks"][name] = measure(benchmark, args.iterations)
+            print(
+                f"{name:<22}"
+                f" {results['benchmarks'][name]['wall_time']['mean'] * 1000:9.3f}ms",
+                file=sys.stderr,
+            )
+
+output = json.dumps(results, indent=2)
+if args.output:
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        output_file.write(output)
+else:
+    print(output)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""SOAP response parsing benchmark script."""
+
+import sys
+import timeit
+
+import xmltodict
+
+from pyskyqremote.classes.deviceaccess import (
+    SOAP_REQUESTS,
+    build_soap_request,
+    parse_soap_response,
+)
+from pyskyqremote.const import (
+    SOAP_RESPONSE,
+    UPNP_GET_MEDIA_INFO,
+    UPNP_GET_TRANSPORT_INFO,
+)
+
+# Run ./bash_soap_benchmark.py [iterations]
+# example: ./bash_soap_benchmark.py 100000
+TRANSPORT_INFO = (
+    '<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/" '
+    's:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/"><s:Body>'
+    '<u:GetTransportInfoResponse xmlns:u="urn:schemas-nds-com:service:SkyPlay:2">'
+    "<CurrentTransportState>PLAYING</CurrentTransportState>"
+    "<CurrentTransportStatus>OK</CurrentTransportStatus>"
+    "<CurrentSpeed>1</CurrentSpeed>"
+    "</u:GetTransportInfoResponse></s:Body></s:Envelope>"
+)
+MEDIA_INFO = (
+    '<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/" '
+    's:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/"><s:Body>'
+    '<u:GetMediaInfoResponse xmlns:u="urn:schemas-nds-com:service:SkyPlay:2">'
+    "<NrTracks>1</NrTracks><MediaDuration>0:00:00</MediaDuration>"
+    "<CurrentURI>xsi://7D2</CurrentURI><CurrentURIMetaData>NOT_IMPLEMENTED"
+    "</CurrentURIMetaData><NextURI></NextURI><NextURIMetaData>NOT_IMPLEMENTED"
+    "</NextURIMetaData><PlayMedium>NETWORK</PlayMedium>"
+    "<RecordMedium>NOT_IMPLEMENTED</RecordMedium>"
+    "<WriteStatus>NOT_IMPLEMENTED</WriteStatus>"
+    "</u:GetMediaInfoResponse></s:Body></s:Envelope>"
+)
+
+iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+
+def report(name, previous, current):
+    """Print the time per call of the previous and current code."""
+    print(
+        f"{name:<20} previous {previous / iterations * 1e6:7.2f}us"
+        f"  current {current / iterations * 1e6:7.2f}us"
+        f"  x{previous / current:.1f}"
+    )
+
+
+for method, xml in [
+    (UPNP_GET_TRANSPORT_INFO, TRANSPORT_INFO),
+    (UPNP_GET_MEDIA_INFO, MEDIA_INFO),
+]:
+    report(
+        method,
+        timeit.timeit(
+            lambda xml=xml, method=method: xmltodict.parse(xml)["s:Envelope"][
+                "s:Body"
+            ][SOAP_RESPONSE.format(method)],
+            number=iterations,
+        ),
+        timeit.timeit(
+            lambda xml=xml, method=method: parse_soap_response(xml, method),
+            number=iterations,
+        ),
+    )
+
+report(
+    "Build request",
+    timeit.timeit(
+        lambda: build_soap_request(UPNP_GET_TRANSPORT_INFO), number=iterations
+    ),
+    timeit.timeit(
+        lambda: SOAP_REQUESTS.get(UPNP_GET_TRANSPORT_INFO)
+        or build_soap_request(UPNP_GET_TRANSPORT_INFO),
+        number=iterations,
+    ),
+)